@@ -1,9 +1,10 @@
-import os, importlib, asyncio
+import os, importlib, asyncio, time
 from urllib.parse import urlparse
 
 from concurrent.futures import ThreadPoolExecutor
 
 import yaml
+import aiohttp
 
 with open("config.yml", "r") as f:
     config = yaml.load(f, yaml.Loader)
@@ -12,15 +13,25 @@ from fastapi import FastAPI, Request
 from fastapi import status, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
 
 from helpers.repository_map import repo
-from helpers.data_compilers import (
-    compile_particles_list,
-    compile_engines_list,
-    compile_skins_list,
+from helpers.hash_manifest import HashManifest
+from helpers.data_compilers import compile_all
+from helpers.file_watcher import CatalogWatcher
+from helpers.backend_client import BackendClient, BackendError
+from helpers.feed_cache import FeedCache
+from helpers.owoify import configure_owoify_cache, precompute_static_uwu
+from helpers.signature import SignatureVerifier
+from helpers.config_validator import (
+    create_validator,
+    LEVEL_BACKGROUNDS,
+    UWU_LEVELS,
+    UWU_SUPPORTED_LOCALES,
+    STAFF_PICK_CONFIGS,
 )
 from locales.locale import Locale
 
@@ -53,8 +64,148 @@ class SonolusFastAPI(FastAPI):
         ]
 
         self.repository = repo
+        zip_cache_config = self.config.get("zip-cache", {})
+        repo.zip_cache.configure(
+            max_bytes=zip_cache_config.get("max-bytes"),
+            max_archives=zip_cache_config.get("max-archives"),
+        )
+        configure_owoify_cache(self.config.get("owoify-cache", {}).get("max-entries"))
+        manifest_path = self.config.get("hash-manifest", ".hash_manifest.json")
+        if manifest_path:
+            repo.manifest = HashManifest(manifest_path).load()
+
+        # valid configuration query values, checked by SonolusMiddleware
+        self.config_validator = create_validator(self.base_url)
+
+        watch_config = self.config.get("watch-files", {})
+        self.watcher: CatalogWatcher | None = None
+        if watch_config.get("enabled", True):
+            self.watcher = CatalogWatcher(
+                "files",
+                poll_interval=watch_config.get("poll-interval", 2),
+                debounce=watch_config.get("debounce", 0.5),
+            )
+
+        # Sonolus-Signature checks (authenticate routes), see start_signature_verifier
+        self.signature_verifier = SignatureVerifier(
+            workers=self.config.get("signature-verification", {}).get("workers", 2),
+            executor=self.executor,
+        )
+
+        # shared backend connection pool and typed client, see open_session
+        self.session: aiohttp.ClientSession | None = None
+        self.backend: BackendClient | None = None
+
+        feed_cache_config = self.config.get("level-feed-cache", {})
+        self.feed_cache = FeedCache(
+            ttl=feed_cache_config.get("ttl", 15),
+            stale_ttl=feed_cache_config.get("stale-ttl", 120),
+            random_pool=feed_cache_config.get("random-pool", True),
+            random_pool_size=feed_cache_config.get("random-pool-size", 30),
+        )
 
         self.exception_handlers.setdefault(HTTPException, self.http_exception_handler)
+        self.exception_handlers.setdefault(BackendError, self.backend_exception_handler)
+        self.add_event_handler("startup", self.open_session)
+        self.add_event_handler("startup", self.warm_up)
+        self.add_event_handler("startup", self.start_watcher)
+        self.add_event_handler("startup", self.start_signature_verifier)
+        self.add_event_handler("shutdown", self.stop_watcher)
+        self.add_event_handler("shutdown", self.stop_signature_verifier)
+        self.add_event_handler("shutdown", self.close_session)
+        self.add_event_handler("shutdown", self.save_hash_manifest)
+
+    async def open_session(self):
+        """
+        Open the long-lived backend session. Every route talks to the
+        backend through this one connection pool instead of opening its own.
+        """
+        client_config = self.api_config.get("client", {})
+        timeout_config = client_config.get("timeout", {})
+        connector = aiohttp.TCPConnector(
+            limit=client_config.get("limit", 100),
+            limit_per_host=client_config.get("limit-per-host", 0),
+            keepalive_timeout=client_config.get("keepalive-timeout", 30),
+            use_dns_cache=True,
+            ttl_dns_cache=client_config.get("dns-cache-ttl", 300),
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=timeout_config.get("total", 15),
+                connect=timeout_config.get("connect", 5),
+                sock_read=timeout_config.get("read"),
+            ),
+        )
+        self.backend = BackendClient(
+            self.session,
+            self.api_config["url"],
+            self.auth_header,
+            self.auth,
+            client_config,
+        )
+
+    async def close_session(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def save_hash_manifest(self):
+        await self.run_blocking(self.repository.manifest.save)
+
+    async def warm_up(self):
+        """
+        Hash every asset in parallel, compile every catalog for every
+        locale and owoify the locale messages before serving, instead of
+        stalling the first requests.
+        """
+        warm_up_config = self.config.get("warm-up", {})
+        if warm_up_config.get("enabled", True):
+            start = time.perf_counter()
+            count = await self.run_blocking(
+                self.repository.prehash, "files", warm_up_config.get("hash-workers", 8)
+            )
+            hashed = time.perf_counter()
+            print(
+                f"[WARMUP] Hashed {count} files in {hashed - start:.2f}s "
+                f"({self.repository.manifest.stats['hits']} unchanged)"
+            )
+            await self.run_blocking(compile_all, self.base_url)
+            compiled = time.perf_counter()
+            print(f"[WARMUP] Compiled catalogs in {compiled - hashed:.2f}s")
+            count = await self.run_blocking(
+                precompute_static_uwu,
+                {
+                    locale: Locale.get_messages(locale)[0].strings()
+                    for locale in UWU_SUPPORTED_LOCALES
+                },
+            )
+            print(
+                f"[WARMUP] Precomputed {count} uwu strings "
+                f"in {time.perf_counter() - compiled:.2f}s"
+            )
+            await self.run_blocking(self.repository.manifest.save)
+        await self.run_blocking(self.config_validator.build)
+
+    async def start_watcher(self):
+        if self.watcher is not None:
+            self.watcher.start()
+
+    async def stop_watcher(self):
+        if self.watcher is not None:
+            await self.run_blocking(self.watcher.stop)
+
+    async def start_signature_verifier(self):
+        start = time.perf_counter()
+        await self.run_blocking(self.signature_verifier.start)
+        if self.signature_verifier.workers > 0:
+            print(
+                f"[WARMUP] Started {self.signature_verifier.workers} signature "
+                f"workers in {time.perf_counter() - start:.2f}s"
+            )
+
+    async def stop_signature_verifier(self):
+        await self.run_blocking(self.signature_verifier.stop)
 
     async def run_blocking(self, func, *args, **kwargs):
         return await asyncio.get_event_loop().run_in_executor(
@@ -66,6 +217,12 @@ class SonolusFastAPI(FastAPI):
             route, self.config["items-per-page"].get("default")
         )
 
+    async def backend_exception_handler(self, request: Request, exc: BackendError):
+        # only reached when a route doesn't handle the error itself
+        return await self.http_exception_handler(
+            request, HTTPException(status_code=exc.status, detail=exc.detail)
+        )
+
     async def http_exception_handler(self, request: Request, exc: HTTPException):
         if exc.status_code < 500:
             return JSONResponse(
@@ -83,72 +240,93 @@ class SonolusFastAPI(FastAPI):
 VERSION_REGEX = r"^\d+\.\d+\.\d+$"
 
 
-class SonolusMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request.state.localization = request.query_params.get(
-            "localization", "en"
-        ).lower()
-        uwu_supported = ["tr", "en"]
-        request.state.uwu = (
-            request.query_params.get("uwu", "off").lower()
-            if request.state.localization in uwu_supported
+class SonolusMiddleware:
+    """
+    Reads the server configuration from the query string into request.state
+    and adds the Sonolus-Version header to every response.
+
+    Plain ASGI middleware: values are checked against the app's
+    ConfigValidator, so nothing here runs on the executor.
+    """
+
+    # routes that don't use the configuration
+    skip_prefixes = ("/sonolus/repository/",)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        app: SonolusFastAPI = scope["app"]
+        version = app.config["required-client-version"]
+
+        async def send_with_version(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["Sonolus-Version"] = version
+            await send(message)
+
+        if scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send_with_version)
+            return
+
+        request = Request(scope)
+        query = request.query_params
+        validator = app.config_validator
+        if not validator.built:
+            # built by warm_up on the executor; compiling every catalog
+            # here would block the event loop
+            response = JSONResponse(
+                content={"message": "Starting up"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "5"},
+            )
+            await response(scope, receive, send_with_version)
+            return
+
+        localization = query.get("localization", "en").lower()
+        uwu = (
+            query.get("uwu", "off").lower()
+            if localization in UWU_SUPPORTED_LOCALES
             else "off"
         )
-        request.state.levelbg = request.query_params.get(
-            "levelbg", "default_or_v3"
-        ).lower()
-        request.state.staff_pick = request.query_params.get(
-            "stpickconfig", "off"
-        ).lower()
-        request.state.particle = request.query_params.get(
-            "defaultparticle", "engine_default"
-        ).lower()
-        request.state.skin = request.query_params.get(
-            "defaultskin", "engine_default"
-        ).lower()
-        skins = await request.app.run_blocking(compile_skins_list, request.app.base_url)
-        supported_skins = list(set([skin["theme"] for skin in skins]))
-        engines = await request.app.run_blocking(
-            compile_engines_list, request.app.base_url, request.state.localization
-        )
-        request.state.engine = request.query_params.get(
-            "defaultengine", engines[0]["name"]
-        )
-        request.state.loc, request.state.localization = Locale.get_messages(
-            request.state.localization
-        )
-        try:
-            assert request.state.levelbg in [
-                "default_or_v3",
-                "default_or_v1",
-                "v1",
-                "v3",
-            ]
-            assert request.state.uwu in ["off", "uwu", "owo", "uvu"]
-            assert request.state.staff_pick in ["off", "true", "false"]
-            particles = await request.app.run_blocking(
-                compile_particles_list, request.app.base_url
-            )
-            assert request.state.particle in [
-                "engine_default",
-                *[item["name"] for item in particles],
-            ]
-            assert request.state.engine in [item["name"] for item in engines]
-            assert request.state.skin in ["engine_default", *supported_skins]
-        except AssertionError:
-            return JSONResponse(
+        levelbg = query.get("levelbg", "default_or_v3").lower()
+        staff_pick = query.get("stpickconfig", "off").lower()
+        particle = query.get("defaultparticle", "engine_default").lower()
+        skin = query.get("defaultskin", "engine_default").lower()
+        engine = query.get("defaultengine", validator.default_engine)
+
+        if not (
+            levelbg in LEVEL_BACKGROUNDS
+            and uwu in UWU_LEVELS
+            and staff_pick in STAFF_PICK_CONFIGS
+            and particle in validator.particles
+            and engine in validator.engines
+            and skin in validator.skins
+        ):
+            response = JSONResponse(
                 content={"message": "Invalid configuration"},
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-        query_params = dict(request.query_params)
-        for item in request.app.remove_config_queries:
+            await response(scope, receive, send)
+            return
+
+        state = request.state
+        state.uwu = uwu
+        state.levelbg = levelbg
+        state.staff_pick = staff_pick
+        state.particle = particle
+        state.skin = skin
+        state.engine = engine
+        state.loc, state.localization = Locale.get_messages(localization)
+        query_params = dict(query)
+        for item in app.remove_config_queries:
             query_params.pop(item, None)
-        request.state.query_params = query_params
-        response = await call_next(request)
-        response.headers["Sonolus-Version"] = request.app.config[
-            "required-client-version"
-        ]
-        return response
+        state.query_params = query_params
+
+        await self.app(scope, receive, send_with_version)
 
 
 app = SonolusFastAPI(debug=debug, base_url=config["server"]["base-url"])
@@ -257,6 +435,7 @@ async def startup_event():
     else:
         load_routes(folder, cleanup=debug)
         print("Routes loaded!")
+    print("Ready!")
 
 
 app.add_event_handler("startup", startup_event)
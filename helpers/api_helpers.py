@@ -1,270 +1,348 @@
-from typing import Any
+import threading
 
-from functools import lru_cache
 from helpers.data_compilers import (
-    compile_engines_list,
-    compile_backgrounds_list,
-    compile_particles_list,
-    compile_skins_list,
+    engines_catalog,
+    backgrounds_catalog,
+    particles_catalog,
+    skins_catalog,
+    on_clear_compile_cache,
 )
 from locales.locale import Loc
-from helpers.models.sonolus.item import LevelItem
+from helpers.models.sonolus.item import (
+    LevelItem,
+    SkinItem,
+    ParticleItem,
+    EngineItem,
+    BackgroundItem,
+)
+from helpers.models.api.levels import Chart
 from helpers.owoify import handle_uwu
 from datetime import datetime, timedelta, timezone
 
 
-def api_level_to_level(
-    request,
-    asset_base_url: str,
-    i: dict,
-    bgtype: str,
-    include_description: bool = False,
-    disable_replace_missing_preview: bool = False,
-    context: str = "list",  # or level
-) -> tuple[LevelItem, str | None]: # TODO
-    loc: Loc = request.state.loc
+class LevelTemplate:
+    """
+    The parts of a level that are identical for every chart under one
+    (engine, skin, particle, locale) configuration: the engine item, the
+    useSkin/useParticle/useEffect blocks and the background base. They are
+    dumped to plain dicts once and shared by every level built from them,
+    so treat them as read-only.
+    """
 
-    @lru_cache(maxsize=None)
-    def get_cached_particle(base_url: str, particle_name: str):
-        particles = compile_particles_list(base_url)
-        particle_data = next(
-            particle for particle in particles if particle["name"] == particle_name
-        )
-        return particle_data
-
-    @lru_cache(maxsize=None)
-    def get_cached_skin(
-        base_url: str, skin_name: str, engine_name: str, localization: str
-    ) -> dict[str, Any]:
-        skins = compile_skins_list(base_url)
-
-        candidates = [
-            skin
-            for skin in skins
-            if skin.get("theme") == skin_name
-            and ("engines" not in skin or engine_name in skin["engines"])
-        ]
+    def __init__(
+        self,
+        resolver: "ResourceResolver",
+        engine: str,
+        skin: str,
+        particle: str,
+        locale: str,
+    ):
+        self.engine = resolver.engine(engine, locale).model_dump(mode="json")
+        self.background = resolver.background(locale).model_dump(mode="json")
+        self.use_effect = {"useDefault": True}
 
-        if not candidates:
-            raise KeyError("no matching theme/engine for skin found")
+        self.use_skin = {"useDefault": True}
+        if skin != "engine_default":
+            try:
+                self.use_skin = {
+                    "useDefault": False,
+                    "item": resolver.skin(skin, engine, locale).model_dump(
+                        mode="json"
+                    ),
+                }
+            except KeyError:  # engine does not have a correctly-themed skin
+                pass
 
-        #  try to match locale
-        for skin in candidates:
-            if skin.get("locale") == localization:
-                return skin
+        self.use_particle = {"useDefault": True}
+        if particle != "engine_default":
+            try:
+                self.use_particle = {
+                    "useDefault": False,
+                    "item": resolver.particle(particle).model_dump(mode="json"),
+                }
+            except KeyError:
+                pass
 
-        # fallback: find skin where no locale is set (some global skin)
-        for skin in candidates:
-            if skin.get("locale") == None:
-                return skin
 
-        # fallback 2: just return first item
-        return candidates[0]
+class ResourceResolver:
+    """
+    Level resources of one source, looked up in the name-indexed catalogs,
+    plus the level templates built from them. Dropped with
+    clear_compile_cache. Lookups raise KeyError when nothing matches.
+    """
 
-    @lru_cache(maxsize=None)
-    def get_cached_background(base_url: str, localization: str):
-        return compile_backgrounds_list(base_url, localization)[0].copy()
+    def __init__(self, source: str):
+        self.source = source
+        self._templates: dict[tuple[str, str, str, str], LevelTemplate] = {}
 
-    @lru_cache(maxsize=None)
-    def get_cached_engine(base_url: str, engine_name: str, locale: str):
-        engines = compile_engines_list(base_url, locale)
-        engine_data = next(
-            engine for engine in engines if engine["name"] == engine_name
-        )
-        return engine_data
-
-    author = i["author"]
-    level_id = i["id"]
-
-    def make_url(file_hash: str) -> str:
-        return "/".join([asset_base_url, author, level_id, file_hash])
-
-    default = bgtype.startswith("default_or_")
-    if default:
-        bgtype = bgtype.removeprefix("default_or_")
-        background_hash = i.get("background_file_hash")
-    else:
-        background_hash = None
-
-    if not background_hash:
-        default = False
-        background_hash = i[f"background_{bgtype}_file_hash"]
-
-    bg_item = get_cached_background(request.app.base_url, request.state.localization)
-    bg_item["image"] = {"hash": background_hash, "url": make_url(background_hash)}
-    bg_item["thumbnail"] = {
-        "hash": i["jacket_file_hash"],
-        "url": make_url(i["jacket_file_hash"]),
-    }
-    bg_item["name"] = "configured"
-    if not default and bgtype == "v3":
-        title = loc.background.V3
-    elif not default and bgtype == "v1":
-        title = loc.background.V1
-    else:
-        title = loc.background.UPLOADED
-    bg_item["title"] = handle_uwu(title, request.state.localization, request.state.uwu)
-
-    if request.state.skin == "engine_default":
-        skin_option = {"useDefault": True}
-    else:
-        try:
-            skin_option = {
-                "useDefault": False,
-                "item": get_cached_skin(
-                    request.app.base_url,
-                    request.state.skin,
-                    request.state.engine,
-                    request.state.localization,
-                ),
-            }
-        except:  # handles if an engine does not have a correctly-themed skin, KeyError
-            skin_option = {"useDefault": True}
-
-    if request.state.particle == "engine_default":
-        particle_option = {"useDefault": True}
-    else:
-        try:
-            particle_option = {
-                "useDefault": False,
-                "item": get_cached_particle(
-                    request.app.base_url, request.state.particle
-                ),
-            }
-        except:
-            particle_option = {"useDefault": True}
-
-    if i.get("published_at"):
-        key = "published_at"
-    else:
-        key = "created_at"
-    created_at = datetime.fromisoformat(i[key].rstrip("Z")).astimezone(timezone.utc)
-    now = datetime.now(timezone.utc)
-    delta = now - created_at
+    def skin(self, theme: str, engine: str, locale: str) -> SkinItem:
+        return skins_catalog(self.source).resolve(theme, engine, locale)
+
+    def particle(self, name: str) -> ParticleItem:
+        particle = particles_catalog(self.source).get(name)
+        if particle is None:
+            raise KeyError(name)
+        return particle
+
+    def engine(self, name: str, locale: str) -> EngineItem:
+        engine = engines_catalog(self.source, locale).get(name)
+        if engine is None:
+            raise KeyError(name)
+        return engine
+
+    def background(self, locale: str) -> BackgroundItem:
+        return backgrounds_catalog(self.source, locale)[0]
+
+    def template(
+        self, engine: str, skin: str, particle: str, locale: str
+    ) -> LevelTemplate:
+        key = (engine, skin, particle, locale)
+        template = self._templates.get(key)
+        if template is None:
+            template = LevelTemplate(self, engine, skin, particle, locale)
+            self._templates[key] = template
+        return template
+
+
+_resolvers: dict[str, ResourceResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(source: str) -> ResourceResolver:
+    resolver = _resolvers.get(source)
+    if resolver is None:
+        with _resolvers_lock:
+            resolver = _resolvers.setdefault(source, ResourceResolver(source))
+    return resolver
+
+
+@on_clear_compile_cache
+def _clear_resolvers(specific: str | None):
+    # any catalog can feed an engine, so every template is rebuilt
+    _resolvers.clear()
+
+
+VISIBILITY_TAGS = {
+    "PUBLIC": {"title": "#PUBLIC", "icon": "globe"},
+    "PRIVATE": {"title": "#PRIVATE", "icon": "lock"},
+    "UNLISTED": {"title": None, "icon": "unlock"},  # localized per request
+}
+
+
+def time_ago(delta: timedelta) -> str:
     if delta >= timedelta(days=1):
-        days = delta.days
-        time_str = f"{days}d"
+        return f"{delta.days}d"
     elif delta >= timedelta(hours=1):
-        hours = delta.seconds // 3600
-        time_str = f"{hours}h"
+        return f"{delta.seconds // 3600}h"
     elif delta >= timedelta(minutes=1):
-        minutes = delta.seconds // 60
-        time_str = f"{minutes}m"
+        return f"{delta.seconds // 60}m"
     elif delta >= timedelta(seconds=1):
-        seconds = delta.seconds
-        time_str = f"{seconds}s"
-    else:
-        time_str = "0s"
-    created_at_str = handle_uwu(
-        (
+        return f"{delta.seconds}s"
+    return "0s"
+
+
+class LevelConverter:
+    """
+    Turns backend charts into level items for one request.
+
+    Everything that only depends on the request (locale, uwu level, the
+    level template for its configuration and the current time) is worked
+    out once in __init__, then shared by every chart passed to convert().
+    """
+
+    def __init__(
+        self,
+        request,
+        asset_base_url: str,
+        bgtype: str,
+        context: str = "list",  # or level
+    ):
+        self.asset_base_url = asset_base_url
+        self.context = context
+        self.source = request.app.base_url
+        self.loc: Loc = request.state.loc
+        self.localization: str = request.state.localization
+        self.uwu: str = request.state.uwu
+        self.now = datetime.now(timezone.utc)
+
+        self.default_bg = bgtype.startswith("default_or_")
+        self.bgtype = bgtype.removeprefix("default_or_")
+
+        self.template = get_resolver(self.source).template(
+            request.state.engine,
+            request.state.skin,
+            request.state.particle,
+            self.localization,
+        )
+        if self.bgtype == "v3":
+            self.bg_title = self.uwuify(self.loc.background.V3)
+        elif self.bgtype == "v1":
+            self.bg_title = self.uwuify(self.loc.background.V1)
+        else:
+            self.bg_title = self.uwuify(self.loc.background.UPLOADED)
+        self.uploaded_bg_title = self.uwuify(self.loc.background.UPLOADED)
+
+    def uwuify(self, text: str) -> str:
+        return handle_uwu(text, self.localization, self.uwu)
+
+    def convert(
+        self,
+        i: Chart,
+        include_description: bool = False,
+        disable_replace_missing_preview: bool = False,
+    ) -> tuple[LevelItem, str | None]:
+        loc = self.loc
+        context = self.context
+        author = i.author
+        level_id = i.id
+
+        def make_url(file_hash: str) -> str:
+            return "/".join([self.asset_base_url, author, level_id, file_hash])
+
+        background_hash = i.background_file_hash if self.default_bg else None
+        if background_hash:
+            bg_title = self.uploaded_bg_title
+        else:
+            background_hash = getattr(i, f"background_{self.bgtype}_file_hash")
+            bg_title = self.bg_title
+
+        bg_item = {
+            **self.template.background,
+            "name": "configured",
+            "title": bg_title,
+            "image": {"hash": background_hash, "url": make_url(background_hash)},
+            "thumbnail": {
+                "hash": i.jacket_file_hash,
+                "url": make_url(i.jacket_file_hash),
+            },
+        }
+
+        if i.published_at:
+            key = "published_at"
+            created_at = i.published_at
+        else:
+            key = "created_at"
+            created_at = i.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        time_str = time_ago(self.now - created_at)
+        created_at_str = self.uwuify(
             loc.time_ago(time_str)
             if key == "published_at"
             else loc.time_ago_not_published(time_str)
-        ),
-        request.state.localization,
-        request.state.uwu,
-    )
+        )
 
-    if context == "list":
-        additional = []
-        tags = [
-            {"title": handle_uwu(tag, request.state.localization, request.state.uwu)}
-            for tag in i["tags"]
+        if context == "list":
+            additional = []
+            tags = [{"title": self.uwuify(tag)} for tag in i.tags]
+        elif context == "level":
+            additional = [
+                {
+                    "title": VISIBILITY_TAGS[i.status]["title"]
+                    or loc.search.VISIBILITY_UNLISTED,
+                    "icon": VISIBILITY_TAGS[i.status]["icon"],
+                }
+            ]
+            tags = [{"title": self.uwuify(tag), "icon": "tag"} for tag in i.tags]
+
+        metadata = [
+            {"title": created_at_str, "icon": "clock"},
+            {
+                "title": str(i.like_count),
+                "icon": "heart" if i.liked else "heartHollow",
+            },
+            {
+                "title": str(i.comment_count),
+                "icon": "comment",
+            },
         ]
-    elif context == "level":
-        VISIBILITIES = {
-            "PUBLIC": {"title": "#PUBLIC", "icon": "globe"},
-            "PRIVATE": {"title": "#PRIVATE", "icon": "lock"},
-            "UNLISTED": {
-                "title": loc.search.VISIBILITY_UNLISTED,
-                "icon": "unlock",
+
+        leveldata = {
+            "name": f"UnCh-{level_id}",
+            "source": self.source,
+            "version": 1,
+            "rating": i.rating,
+            "artists": self.uwuify(i.artists),
+            "author": i.author_full,
+            "title": self.uwuify(i.title),
+            "tags": (additional + metadata + tags),
+            "engine": self.template.engine,
+            "useSkin": self.template.use_skin,
+            "useEffect": self.template.use_effect,
+            "useParticle": self.template.use_particle,
+            "useBackground": {"useDefault": False, "item": bg_item},
+            "cover": {
+                "hash": i.jacket_file_hash,
+                "url": make_url(i.jacket_file_hash),
             },
+            "data": {"hash": i.chart_file_hash, "url": make_url(i.chart_file_hash)},
+            "bgm": {"hash": i.music_file_hash, "url": make_url(i.music_file_hash)},
         }
-        additional = [
-            {
-                "title": VISIBILITIES[i["status"]]["title"],
-                "icon": VISIBILITIES[i["status"]]["icon"],
+
+        if i.preview_file_hash:
+            leveldata["preview"] = {
+                "hash": i.preview_file_hash,
+                "url": make_url(i.preview_file_hash),
             }
-        ]
-        tags = [
-            {
-                "title": handle_uwu(tag, request.state.localization, request.state.uwu),
-                "icon": "tag",
+        elif not disable_replace_missing_preview:
+            leveldata["preview"] = {
+                "hash": i.music_file_hash,
+                "url": make_url(i.music_file_hash),
             }
-            for tag in i["tags"]
-        ]
 
-    metadata = [
-        {"title": created_at_str, "icon": "clock"},
-        {
-            "title": str(i["like_count"]),
-            "icon": "heart" if i.get("liked") else "heartHollow",
-        },
-        {
-            "title": str(i["comment_count"]),
-            "icon": "comment",
-        },
-    ]
-
-    leveldata = {
-        "name": f"UnCh-{level_id}",
-        "source": request.app.base_url,
-        "version": 1,
-        "rating": i["rating"],
-        "artists": handle_uwu(
-            i["artists"], request.state.localization, request.state.uwu
-        ),
-        "author": i["author_full"],
-        "title": handle_uwu(i["title"], request.state.localization, request.state.uwu),
-        "tags": (additional + metadata + tags),
-        "engine": get_cached_engine(
-            request.app.base_url, request.state.engine, request.state.localization
-        ),
-        "useSkin": skin_option,
-        "useEffect": {"useDefault": True},
-        "useParticle": particle_option,
-        "useBackground": {"useDefault": False, "item": bg_item},
-        "cover": {
-            "hash": i["jacket_file_hash"],
-            "url": make_url(i["jacket_file_hash"]),
-        },
-        "data": {"hash": i["chart_file_hash"], "url": make_url(i["chart_file_hash"])},
-        "bgm": {"hash": i["music_file_hash"], "url": make_url(i["music_file_hash"])},
-    }
-
-    if i.get("preview_file_hash"):
-        leveldata["preview"] = {
-            "hash": i["preview_file_hash"],
-            "url": make_url(i["preview_file_hash"]),
-        }
-    elif not disable_replace_missing_preview:
-        leveldata["preview"] = {
-            "hash": i["music_file_hash"],
-            "url": make_url(i["music_file_hash"]),
-        }
+        if i.staff_pick:
+            if context == "list":
+                leveldata["tags"].insert(
+                    0,
+                    {
+                        "title": "",
+                        "icon": "trophy",
+                    },
+                )
+            elif context == "level":
+                leveldata["tags"].insert(
+                    0,
+                    {
+                        "title": loc.staff_pick,
+                        "icon": "trophy",
+                    },
+                )
 
-    if i["staff_pick"]:
-        if context == "list":
-            leveldata["tags"].insert(
-                0,
-                {
-                    "title": "",
-                    "icon": "trophy",
-                },
-            )
-        elif context == "level":
-            leveldata["tags"].insert(
-                0,
-                {
-                    "title": loc.staff_pick,
-                    "icon": "trophy",
-                },
-            )
-
-    if not include_description:
-        return leveldata, None
-    else:
-        desc = i.get("description")
-        if desc:
-            desc = handle_uwu(desc, request.state.localization, request.state.uwu)
-        return leveldata, desc
+        if not include_description:
+            return leveldata, None
+        else:
+            desc = i.description
+            if desc:
+                desc = self.uwuify(desc)
+            return leveldata, desc
+
+
+def api_level_to_level(
+    request,
+    asset_base_url: str,
+    i: Chart,
+    bgtype: str,
+    include_description: bool = False,
+    disable_replace_missing_preview: bool = False,
+    context: str = "list",  # or level
+) -> tuple[LevelItem, str | None]: # TODO
+    return LevelConverter(request, asset_base_url, bgtype, context).convert(
+        i, include_description, disable_replace_missing_preview
+    )
+
+
+def api_levels_to_levels(
+    request,
+    asset_base_url: str,
+    items: list[Chart],
+    bgtype: str,
+    context: str = "list",  # or level
+) -> list[LevelItem]:
+    """
+    Convert a whole backend page at once, e.g. in a single run_blocking call.
+    Per-request state is resolved once and shared by all items.
+    """
+    if not items:
+        return []
+    converter = LevelConverter(request, asset_base_url, bgtype, context)
+    return [converter.convert(i)[0] for i in items]
@@ -0,0 +1,447 @@
+import asyncio, time
+from typing import Any, Awaitable, Callable, Hashable, Literal, TypeVar
+
+import aiohttp
+from pydantic import BaseModel
+
+from helpers.models.api.levels import (
+    LevelList,
+    GetChartResponse,
+    DeleteChartResponse,
+    VisibilityChangeResponse,
+)
+from helpers.models.api.comments import (
+    CommentList,
+    CommentRequest,
+    DeleteCommentResponse,
+)
+from helpers.models.api.notifications import (
+    NotificationList,
+    Notification,
+    NotificationRequest,
+)
+
+M = TypeVar("M", bound=BaseModel)
+
+# statuses worth retrying (for GETs) and counting against the circuit breaker
+RETRY_STATUSES = {502, 503, 504}
+
+
+class BackendError(Exception):
+    """
+    The backend answered with a non-2xx status.
+    Routes catch this to turn it into a localized HTTPException.
+    """
+
+    def __init__(self, status: int, detail: Any = None):
+        super().__init__(f"backend returned {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class BackendUnavailable(BackendError):
+    """
+    The backend could not be reached, timed out, or the circuit is open.
+    """
+
+    def __init__(self, detail: Any = None):
+        super().__init__(503, detail)
+
+
+class CircuitBreaker:
+    """
+    Fails fast once the backend has failed `failure_threshold` times in a row.
+    After `reset_timeout` seconds a single trial request is let through
+    (half-open); its result closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> Literal["closed", "open", "half-open"]:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one.
+    The first caller starts the call; everyone arriving while it is still
+    running awaits the same task and gets the same result (or exception).
+    Nothing is kept after the call finishes, so results are never stale.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "collapsed": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["collapsed"] += 1
+        # shielded, so a disconnecting client doesn't cancel everyone's call
+        return await asyncio.shield(task)
+
+
+class BackendClient:
+    """
+    Typed access to the chart backend.
+
+    All requests go through the app's shared session. Every endpoint has its
+    own timeout (api.client.endpoints in config.yml, falling back to the
+    session timeout), idempotent GETs are retried a bounded number of times,
+    and a circuit breaker stops hammering a backend that is down.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        auth_header: str,
+        auth: str,
+        client_config: dict | None = None,
+    ):
+        client_config = client_config or {}
+        self.session = session
+        self.url = url.removesuffix("/")
+        self.auth_header = auth_header
+        self.auth = auth
+
+        self.endpoint_timeouts: dict[str, float] = client_config.get("endpoints", {})
+        self.retries: int = client_config.get("retries", 2)
+        self.retry_backoff: float = client_config.get("retry-backoff", 0.1)
+        self.coalesce: bool = client_config.get("coalesce", True)
+        self.single_flight = SingleFlight()
+        breaker_config = client_config.get("circuit-breaker", {})
+        self.breaker = CircuitBreaker(
+            failure_threshold=breaker_config.get("failure-threshold", 5),
+            reset_timeout=breaker_config.get("reset-timeout", 10),
+        )
+
+    def _headers(self, auth: str | None) -> dict[str, str]:
+        headers = {self.auth_header: self.auth}
+        if auth:
+            headers["authorization"] = auth
+        return headers
+
+    def _timeout(self, endpoint: str) -> aiohttp.ClientTimeout | None:
+        timeout = self.endpoint_timeouts.get(endpoint)
+        if timeout is None:
+            return None  # session default
+        return aiohttp.ClientTimeout(total=timeout)
+
+    @staticmethod
+    def _clean_params(params: dict | None) -> dict | None:
+        if params is None:
+            return None
+        return {
+            k: (int(v) if isinstance(v, bool) else v)
+            for k, v in params.items()
+            if v is not None
+        }
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        auth: str | None,
+        params: dict | None,
+        json: Any,
+        raw: bool = False,
+    ) -> tuple[int, Any]:
+        async with self.session.request(
+            method,
+            self.url + path,
+            headers=self._headers(auth),
+            params=params,
+            json=json,
+            timeout=self._timeout(endpoint),
+        ) as req:
+            if req.content_type == "application/json" and not raw:
+                data = await req.json()
+            else:
+                data = await req.text()
+            return req.status, data
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        auth: str | None = None,
+        params: dict | None = None,
+        json: Any = None,
+        coalesce: bool = True,
+        retries: int | None = None,
+        raw: bool = False,
+    ) -> Any:
+        """
+        Send a request and return the decoded body (the text as-is with
+        `raw`). Raises BackendError on non-2xx and BackendUnavailable on
+        connection errors, timeouts or an open circuit.
+
+        Identical concurrent GETs (same path, params and session) share one
+        upstream call; the decoded body is shared, so don't mutate it.
+        GETs that aren't idempotent pass coalesce=False and retries=0
+        (`retries` defaults to the client's).
+        """
+        params = self._clean_params(params)
+        if retries is None:
+            retries = self.retries
+        if method == "GET" and self.coalesce and coalesce:
+            key = (
+                path,
+                tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+                auth,
+            )
+            return await self.single_flight.do(
+                key,
+                lambda: self._request(
+                    method, path, endpoint, auth, params, json, retries, raw
+                ),
+            )
+        return await self._request(
+            method, path, endpoint, auth, params, json, retries, raw
+        )
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        auth: str | None,
+        params: dict | None,
+        json: Any,
+        retries: int,
+        raw: bool,
+    ) -> Any:
+        attempts = 1 + (retries if method == "GET" else 0)
+        for attempt in range(attempts):
+            trial = self.breaker.state == "half-open"
+            if not self.breaker.allow():
+                raise BackendUnavailable("circuit open")
+            settled = False
+            try:
+                status, data = await self._send(
+                    method, path, endpoint, auth, params, json, raw
+                )
+                settled = True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                settled = True
+                self.breaker.record_failure()
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(self.retry_backoff * (2**attempt))
+                    continue
+                raise BackendUnavailable(str(e) or type(e).__name__)
+            finally:
+                # cancelled (client went away) or an unreadable body: the
+                # half-open trial still has to end, or allow() refuses every
+                # call from now on
+                if trial and not settled:
+                    self.breaker.record_failure()
+            if status >= 500:
+                self.breaker.record_failure()
+                if status in RETRY_STATUSES and attempt + 1 < attempts:
+                    await asyncio.sleep(self.retry_backoff * (2**attempt))
+                    continue
+            else:
+                self.breaker.record_success()
+            if not 200 <= status < 300:
+                detail = data.get("detail") if isinstance(data, dict) else data
+                raise BackendError(status, detail)
+            return data
+
+    async def _model(self, model: type[M], *args, **kwargs) -> M:
+        return model.model_validate(await self.request(*args, **kwargs))
+
+    # charts
+
+    async def list_charts(self, params: dict, auth: str | None = None) -> LevelList:
+        return await self._model(
+            LevelList, "GET", "/api/charts/", "charts", auth=auth, params=params
+        )
+
+    async def get_chart(self, chart_id: str, auth: str | None = None) -> GetChartResponse:
+        return await self._model(
+            GetChartResponse, "GET", f"/api/charts/{chart_id}/", "chart", auth=auth
+        )
+
+    async def delete_chart(self, chart_id: str, auth: str) -> DeleteChartResponse:
+        return await self._model(
+            DeleteChartResponse,
+            "DELETE",
+            f"/api/charts/{chart_id}/delete/",
+            "chart",
+            auth=auth,
+        )
+
+    async def like_chart(
+        self, chart_id: str, type: Literal["like", "unlike"], auth: str
+    ) -> None:
+        await self.request(
+            "POST", f"/api/charts/{chart_id}/like/", "chart", auth=auth, json={"type": type}
+        )
+
+    async def set_chart_visibility(
+        self,
+        chart_id: str,
+        visibility: Literal["UNLISTED", "PRIVATE", "PUBLIC"],
+        auth: str,
+    ) -> VisibilityChangeResponse:
+        return await self._model(
+            VisibilityChangeResponse,
+            "PATCH",
+            f"/api/charts/{chart_id}/visibility/",
+            "chart",
+            auth=auth,
+            json={"status": visibility},
+        )
+
+    async def rerate_chart(self, chart_id: str, constant: float, auth: str) -> None:
+        await self.request(
+            "PATCH",
+            f"/api/charts/{chart_id}/constant_rate/",
+            "chart",
+            auth=auth,
+            json={"constant": constant},
+        )
+
+    async def set_staff_pick(self, chart_id: str, value: bool, auth: str) -> None:
+        await self.request(
+            "PATCH",
+            f"/api/charts/{chart_id}/stpick/",
+            "chart",
+            auth=auth,
+            json={"value": value},
+        )
+
+    # comments
+
+    async def comments(
+        self, chart_id: str, auth: str | None = None, page: int | None = None
+    ) -> CommentList:
+        return await self._model(
+            CommentList,
+            "GET",
+            f"/api/charts/{chart_id}/comment/",
+            "comments",
+            auth=auth,
+            params={"page": page},
+        )
+
+    async def post_comment(self, chart_id: str, content: str, auth: str) -> None:
+        await self.request(
+            "POST",
+            f"/api/charts/{chart_id}/comment/",
+            "comments",
+            auth=auth,
+            json=CommentRequest(content=content).model_dump(),
+        )
+
+    async def delete_comment(
+        self, chart_id: str, comment_id: int, auth: str
+    ) -> DeleteCommentResponse:
+        return await self._model(
+            DeleteCommentResponse,
+            "DELETE",
+            f"/api/charts/{chart_id}/comment/{comment_id}/",
+            "comments",
+            auth=auth,
+        )
+
+    # notifications
+
+    async def notifications(self, auth: str, only_unread: bool) -> NotificationList:
+        return await self._model(
+            NotificationList,
+            "GET",
+            "/api/accounts/notifications/",
+            "notifications",
+            auth=auth,
+            params={"only_unread": only_unread},
+        )
+
+    async def get_notification(self, notification_id: str, auth: str) -> Notification:
+        return await self._model(
+            Notification,
+            "GET",
+            f"/api/accounts/notifications/{notification_id}/",
+            "notifications",
+            auth=auth,
+        )
+
+    async def send_notification(
+        self, notification: NotificationRequest, auth: str
+    ) -> None:
+        await self.request(
+            "POST",
+            "/api/accounts/notifications/",
+            "notifications",
+            auth=auth,
+            json=notification.model_dump(),
+        )
+
+    # sessions
+
+    async def create_session(self, profile: dict) -> dict:
+        return await self.request(
+            "POST", "/api/accounts/session/", "sessions", json=profile
+        )
+
+    async def create_external_session(self, profile: dict) -> None:
+        await self.request(
+            "POST", "/api/accounts/session/external/", "sessions", json=profile
+        )
+
+    async def account(self, auth: str) -> dict:
+        return await self.request(
+            "GET", "/api/accounts/session/account/", "sessions", auth=auth
+        )
+
+    async def generate_upload_token(self, hashes: str, auth: str | None) -> str:
+        # every call mints a new token: never shared or retried, and the
+        # key is the body as-is, whatever its content type
+        return await self.request(
+            "GET",
+            "/api/accounts/generate_upload_token/",
+            "sessions",
+            auth=auth,
+            params={"hashes": hashes},
+            coalesce=False,
+            retries=0,
+            raw=True,
+        )
@@ -0,0 +1,57 @@
+import threading
+
+from helpers.data_compilers import (
+    particles_catalog,
+    engines_catalog,
+    skins_catalog,
+    on_clear_compile_cache,
+)
+
+LEVEL_BACKGROUNDS = frozenset({"default_or_v3", "default_or_v1", "v1", "v3"})
+UWU_LEVELS = frozenset({"off", "uwu", "owo", "uvu"})
+UWU_SUPPORTED_LOCALES = frozenset({"tr", "en"})
+STAFF_PICK_CONFIGS = frozenset({"off", "true", "false"})
+
+
+class ConfigValidator:
+    """
+    Valid values for the server configuration query parameters
+    (defaultparticle, defaultengine, defaultskin), kept as frozen sets so
+    SonolusMiddleware can check a request without compiling any catalogs.
+
+    Built once at startup and rebuilt whenever the compile cache is cleared.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._lock = threading.Lock()
+        self.particles: frozenset[str] = frozenset()
+        self.engines: frozenset[str] = frozenset()
+        self.skins: frozenset[str] = frozenset()
+        self.default_engine: str | None = None
+        self.built = False
+
+    def build(self):
+        with self._lock:
+            particles = frozenset(
+                {"engine_default"} | particles_catalog(self.source).by_name.keys()
+            )
+            skins = frozenset(("engine_default", *skins_catalog(self.source).themes))
+            # engine names and their order don't depend on the locale
+            engines = [engine.name for engine in engines_catalog(self.source)]
+
+            self.particles = particles
+            self.skins = skins
+            self.engines = frozenset(engines)
+            self.default_engine = engines[0] if engines else None
+            self.built = True
+
+    def invalidate(self, specific: str | None = None):
+        # rebuilt right away, so requests never hit a cold validator
+        self.build()
+
+
+def create_validator(source: str) -> ConfigValidator:
+    validator = ConfigValidator(source)
+    on_clear_compile_cache(validator.invalidate)
+    return validator
@@ -1,4 +1,5 @@
-import json, os
+import functools, json, os, threading
+from typing import Any, Callable
 
 from helpers.models.sonolus.item import (
     EngineItem, 
@@ -13,37 +14,125 @@ from helpers.models.sonolus.misc import SRL
 
 from helpers.repository_map import repo
 
-from locales.locale import Loc, Locale
+from locales.locale import Loc, Locale, SUPPORTED_LOCALES
 
-cached = {
-    "skins": None,
-    "effects": None,
-    "particles": None,
-    "banner": None,
-    "static_posts": None,
-}
+# compiled catalogs, e.g. "skins" or "engines_en"
+cached: dict[str, Any] = {}
 
+# a catalog can legitimately compile to None or []
+_MISSING = object()
+_compile_locks: dict[str, threading.Lock] = {}
+_compile_locks_lock = threading.Lock()
+# cache key -> (compile function, args, kwargs) it was compiled with
+_compiled_with: dict[str, tuple[Callable, tuple, dict]] = {}
+# bumped by clear_compile_cache, so a compile that started before a clear
+# doesn't store its (possibly stale) result afterwards
+_generation = 0
 
-def clear_compile_cache(specific: str = None):
-    global cached
-    if specific:
-        cached[specific] = None
-    else:
-        new_cached = {}
-        for k in cached.keys():
-            new_cached[k] = None
-        cached = new_cached.copy()
+# called with `specific` after the cache is cleared, for indexes built on top
+_clear_listeners: list[Callable[[str | None], None]] = []
+
+
+def on_clear_compile_cache(listener: Callable[[str | None], None]):
+    _clear_listeners.append(listener)
+    return listener
 
 
+def clear_compile_cache(specific: str = None):
+    """
+    Clear one catalog (e.g. "skins", or "engines" for every locale, or
+    "engines_en" for one) or all of them.
+    """
+    global _generation
+    with _compile_locks_lock:
+        _generation += 1
+        if specific:
+            for key in _matching_keys(specific):
+                del cached[key]
+        else:
+            cached.clear()
+    for listener in _clear_listeners:
+        listener(specific)
+
+
+def _compile_lock(cache_key: str) -> threading.Lock:
+    with _compile_locks_lock:
+        return _compile_locks.setdefault(cache_key, threading.Lock())
+
+
+def _matching_keys(specific: str) -> list[str]:
+    return [
+        key for key in list(cached) if key == specific or key.startswith(f"{specific}_")
+    ]
+
+
+def recompile(specific: str):
+    """
+    Rebuild the compiled entries of one catalog (same names as
+    clear_compile_cache) and swap each one in when it's ready. Unlike
+    clearing, requests keep getting the old version in the meantime.
+    """
+    for cache_key in _matching_keys(specific):
+        with _compile_lock(cache_key):
+            with _compile_locks_lock:
+                func, args, kwargs = _compiled_with[cache_key]
+                generation = _generation
+            value = func(*args, **kwargs)
+            with _compile_locks_lock:
+                if generation == _generation:
+                    cached[cache_key] = value
+    for listener in _clear_listeners:
+        listener(specific)
+
+
+def single_flight(key: Callable[..., str]):
+    """
+    Cache a compile function's result in cached[key(*args)].
+    Exactly one compile runs per key; concurrent callers wait for it and
+    get the same result.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            value = cached.get(cache_key, _MISSING)
+            if value is not _MISSING:
+                return value
+            with _compile_lock(cache_key):
+                value = cached.get(cache_key, _MISSING)
+                if value is not _MISSING:
+                    return value
+                generation = _generation
+                value = func(*args, **kwargs)
+                with _compile_locks_lock:
+                    _compiled_with[cache_key] = (func, args, kwargs)
+                    if generation == _generation:
+                        cached[cache_key] = value
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def _locale_key(name: str, suffix: str = "") -> Callable[..., str]:
+    def key(source: str | None = None, locale: str = "en") -> str:
+        _, locale = Locale.get_messages(locale)
+        return f"{name}_{locale}{suffix}"
+
+    return key
+
+
+@single_flight(lambda: "banner")
 def compile_banner() -> SRL | None:
-    if cached["banner"]:
-        return cached["banner"]
     path = "files/banner/banner.png"
     if os.path.exists(path):
         hash = repo.add_file(path)
         return repo.get_srl(hash)
     return None
 
+@single_flight(_locale_key("playlists"))
 def compile_playlists_list(
     source: str | None = None, locale: str = "en"
 ) -> list[PlaylistItem]:
@@ -55,8 +144,6 @@ def compile_playlists_list(
         )
     
     loc, locale = Locale.get_messages(locale)
-    if cached.get(f"playlists_{locale}"):
-        return cached[f"playlists_{locale}"]
     compiled_data_list = []
     for playlist in os.listdir("files/playlists"):
         if not os.path.isdir(os.path.join("files", "playlists", playlist)):
@@ -86,14 +173,11 @@ def compile_playlists_list(
             if hash:
                 compiled_data[key] = repo.get_srl(hash)
         compiled_data_list.append(compiled_data)
-    cached[f"playlists_{locale}"] = compiled_data_list
     return compiled_data_list
 
 
+@single_flight(lambda source=None: "static_posts")
 def compile_static_posts_list(source: str = None) -> list[PostItem]:
-    if cached["static_posts"]:
-        return cached["static_posts"]
-    
     compiled_data_list = []
     for post in os.listdir("files/posts"):
         if not os.path.isdir(os.path.join("files", "posts", post)):
@@ -123,7 +207,6 @@ def compile_static_posts_list(source: str = None) -> list[PostItem]:
         )
         compiled_data_list.append(compiled_data)
 
-    cached["static_posts"] = compiled_data_list
     return compiled_data_list
 
 
@@ -131,9 +214,8 @@ def sort_posts_by_newest(posts: list[PostItem]) -> list[PostItem]:
     return sorted(posts, key=lambda post: post.time, reverse=True)
 
 
+@single_flight(lambda source=None: "effects")
 def compile_effects_list(source: str = None) -> list[EffectItem]:
-    if cached["effects"]:
-        return cached["effects"]
     compiled_data_list = []
     for effect in os.listdir("files/effects"):
         if not os.path.isdir(os.path.join("files", "effects", effect)):
@@ -157,31 +239,22 @@ def compile_effects_list(source: str = None) -> list[EffectItem]:
             audio=repo.get_srl(repo.add_file(f"files/effects/{effect}/audio"))
         )
         compiled_data_list.append(compiled_data)
-    cached["effects"] = compiled_data_list
     return compiled_data_list
 
 
-def compile_backgrounds_list(
-    source: str = None,
-    locale: str = "en",
-) -> list[BackgroundItem]:
-    def replace_values(d_value: str):
-        return (
-            d_value.replace("#BACKGROUNDSELECTSUB", loc.background.BACKGROUNDSELECTSUB)
-            .replace("#BACKGROUNDSELECT", loc.background.BACKGROUNDSELECT)
-        )
+# background strings with #BACKGROUNDSELECT... substitutions
+LOCALIZED_BACKGROUND_FIELDS = ("title", "subtitle", "author")
 
-    loc, locale = Locale.get_messages(locale)
-    if cached.get(f"backgrounds_{locale}"):
-        return cached[f"backgrounds_{locale}"]
+
+@single_flight(lambda source=None: "backgrounds_core")
+def compile_backgrounds_core(source: str = None) -> list[BackgroundItem]:
+    """
+    Backgrounds with their strings unsubstituted, shared by every locale.
+    """
     compiled_data_list = []
     for background in os.listdir("files/backgrounds"):
         if not os.path.isdir(os.path.join("files", "backgrounds", background)):
             continue
-        compiled_data: BackgroundItem = {"tags": []}
-        compiled_data["name"] = background
-        if source:
-            compiled_data["source"] = source
         with open(
             f"files/backgrounds/{background}/background.json", "r", encoding="utf8"
         ) as f:
@@ -193,9 +266,9 @@ def compile_backgrounds_list(
             name=background,
             source=source,
             version=background_data["version"],
-            title=replace_values(background_data["title"]),
-            subtitle=replace_values(background_data["subtitle"]),
-            author=replace_values(background_data["author"]),
+            title=background_data["title"],
+            subtitle=background_data["subtitle"],
+            author=background_data["author"],
             tags=[],
             thumbnail=repo.get_srl(repo.add_file(f"files/backgrounds/{background}/thumbnail.png")), # TODO shorten with subrepos for relative paths and srl_from_file
             data=repo.get_srl(repo.add_file(f"files/backgrounds/{background}/data")),
@@ -204,13 +277,42 @@ def compile_backgrounds_list(
         )
 
         compiled_data_list.append(compiled_data)
-    cached[f"backgrounds_{locale}"] = compiled_data_list
     return compiled_data_list
 
 
+@single_flight(_locale_key("backgrounds"))
+def compile_backgrounds_list(
+    source: str = None,
+    locale: str = "en",
+) -> list[BackgroundItem]:
+    """
+    The core backgrounds with this locale's strings. Backgrounds without
+    substitutions are the core items themselves, the others shallow copies
+    sharing everything but the replaced strings.
+    """
+    def replace_values(d_value: str):
+        return (
+            d_value.replace("#BACKGROUNDSELECTSUB", loc.background.BACKGROUNDSELECTSUB)
+            .replace("#BACKGROUNDSELECT", loc.background.BACKGROUNDSELECT)
+        )
+
+    loc, locale = Locale.get_messages(locale)
+    compiled_data_list = []
+    for background in compile_backgrounds_core(source):
+        overlay = {}
+        for key in LOCALIZED_BACKGROUND_FIELDS:
+            value = getattr(background, key)
+            replaced = replace_values(value)
+            if replaced != value:
+                overlay[key] = replaced
+        compiled_data_list.append(
+            background.model_copy(update=overlay) if overlay else background
+        )
+    return compiled_data_list
+
+
+@single_flight(lambda source=None: "particles")
 def compile_particles_list(source: str = None) -> list[tuple[ParticleItem, bool]]:
-    if cached["particles"]:
-        return cached["particles"]
     compiled_data_list = []
     for particle in os.listdir("files/particles"):
         if not os.path.isdir(os.path.join("files", "particles", particle)):
@@ -237,20 +339,16 @@ def compile_particles_list(source: str = None) -> list[tuple[ParticleItem, bool]
         )
 
         compiled_data_list.append((compiled_data, particle_data["engine_specific"]))
-    cached["particles"] = compiled_data_list
     return compiled_data_list
 
 
+@single_flight(lambda source=None: "skins")
 def compile_skins_list(source: str = None) -> list[tuple[SkinItem, list[str], str, str | None]]: # "engines", "theme", "locale"... probably a TODO
-    if cached["skins"]:
-        return cached["skins"]
     compiled_data_list = []
     for skin in os.listdir("files/skins"):
         if not os.path.isdir(os.path.join("files", "skins", skin)):
             continue
 
-        if source:
-            compiled_data["source"] = source
         with open(f"files/skins/{skin}/skin.json", "r", encoding="utf8") as f:
             skin_data: dict = json.load(f)
         if not skin_data.get("enabled", True):
@@ -269,14 +367,25 @@ def compile_skins_list(source: str = None) -> list[tuple[SkinItem, list[str], st
             texture=repo.get_srl(repo.add_file(f"files/skins/{skin}/texture"))
         )
         compiled_data_list.append((compiled_data, skin_data["engines"], skin_data["theme"], skin_data.get("locale")))
-    cached["skins"] = compiled_data_list
     return compiled_data_list
 
 
-def compile_engines_list(source: str = None, locale: str = "en") -> list[EngineItem]:
-    if cached.get(f"engines_{locale}"):
-        return cached[f"engines_{locale}"]
-    compiled_data_list: list[tuple[EngineItem, int | float]] = []
+def _missing_resource(engine: str) -> KeyError:
+    return KeyError(
+        f"Engine {engine} references a missing resource! Make sure your engine file names and resource file names match."
+    )
+
+
+@single_flight(lambda source=None: "engines_core")
+def compile_engines_core(source: str = None) -> list[tuple[EngineItem, dict]]:
+    """
+    Engines with their default skin and unlocalized background, shared by
+    every locale, sorted. Each comes with its engine.json for the overlays.
+    """
+    backgrounds = {
+        background.name: background for background in compile_backgrounds_core(source)
+    }
+    compiled_data_list: list[tuple[EngineItem, dict]] = []
     for engine in os.listdir("files/engines"):
         if not os.path.isdir(os.path.join("files", "engines", engine)):
             continue
@@ -286,73 +395,222 @@ def compile_engines_list(source: str = None, locale: str = "en") -> list[EngineI
         if not engine_data.get("enabled", True):
             continue
 
-        def get_skin_name(engine_data: dict, locale: str) -> str:
-            if engine_data.get("skin_name_locale", {}).get(locale):
-                return engine_data["skin_name_locale"][locale]
-            return engine_data["skin_name"]
-
-        try:
-            skins = compile_skins_list(source)
-            skin_data = next(
-                skin
-                for (skin, _, _) in skins
-                if skin.name == get_skin_name(engine_data, locale)
-            )
-            effects = compile_effects_list(source)
-            effect_data = next(
-                effect
-                for effect in effects
-                if effect.name == engine_data["effect_name"]
-            )
-            particles = compile_particles_list(source)
-            particle_data = next(
-                particle
-                for (particle, _) in particles
-                if particle.name == engine_data["particle_name"]
-            )
-            backgrounds = compile_backgrounds_list(source, locale)
-            background_data = next(
-                background
-                for background in backgrounds
-                if background.name == engine_data["background_name"]
-            )
-        except StopIteration:
-            raise KeyError(
-                "StopIteration raised: incorrect key name! Make sure your engine file names and resource file names match."
-            )
-        
-        compiled_data = (
-            EngineItem(
-                name=engine,
-                version=engine_data.get("key"),
-                title=engine_data.get("title"),
-                subtitle=engine_data.get("subtitle"),
-                source=source,
-                author=engine_data.get("author"),
-                tags=[],
-                description=engine_data.get("description"),
-                skin=skin_data,
-                background=background_data,
-                effect=effect_data,
-                particle=particle_data,
-                thumbnail=repo.get_srl(repo.add_file(f"files/engines/{engine}/thumbnail.png")),
-                playData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EnginePlayData")),
-                watchData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineWatchData")),
-                previewData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EnginePreviewData")),
-                tutorialData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineTutorialData")),
-                rom=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineRom", error_on_file_nonexistent=False)),
-                configuration=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineConfiguration"))
-            ), 
-            engine_data.get("engine_sort_order", float("inf")) # last, if no sort order
+        skin_data = skins_catalog(source).get(engine_data["skin_name"])
+        effect_data = effects_catalog(source).get(engine_data["effect_name"])
+        particle_data = particles_catalog(source).get(engine_data["particle_name"])
+        background_data = backgrounds.get(engine_data["background_name"])
+        if None in (skin_data, effect_data, particle_data, background_data):
+            raise _missing_resource(engine)
+
+        compiled_data = EngineItem(
+            name=engine,
+            version=engine_data.get("key"),
+            title=engine_data.get("title"),
+            subtitle=engine_data.get("subtitle"),
+            source=source,
+            author=engine_data.get("author"),
+            tags=[],
+            description=engine_data.get("description"),
+            skin=skin_data,
+            background=background_data,
+            effect=effect_data,
+            particle=particle_data,
+            thumbnail=repo.get_srl(repo.add_file(f"files/engines/{engine}/thumbnail.png")),
+            playData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EnginePlayData")),
+            watchData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineWatchData")),
+            previewData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EnginePreviewData")),
+            tutorialData=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineTutorialData")),
+            rom=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineRom", error_on_file_nonexistent=False)),
+            configuration=repo.get_srl(repo.add_file(f"files/engines/{engine}/EngineConfiguration"))
         )
-
-        compiled_data_list.append(compiled_data)
+        compiled_data_list.append((compiled_data, engine_data))
     compiled_data_list = sorted(
         compiled_data_list,
         key=lambda item: (
-            item[1],  # engine_sort_order
+            item[1].get("engine_sort_order", float("inf")),  # last, if no sort order
             item[0].title.lower(),  # abc
         ),
     )
-    cached[f"engines_{locale}"] = compiled_data_list
     return compiled_data_list
+
+
+@single_flight(lambda source=None, locale="en": f"engines_{locale}")
+def compile_engines_list(source: str = None, locale: str = "en") -> list[tuple[EngineItem, int | float]]:
+    """
+    The core engines with this locale's skin (skin_name_locale) and
+    background. Engines where neither differs are the core items
+    themselves, the others shallow copies.
+    """
+    def get_skin_name(engine_data: dict, locale: str) -> str:
+        if engine_data.get("skin_name_locale", {}).get(locale):
+            return engine_data["skin_name_locale"][locale]
+        return engine_data["skin_name"]
+
+    compiled_data_list: list[tuple[EngineItem, int | float]] = []
+    for engine, engine_data in compile_engines_core(source):
+        skin_data = skins_catalog(source).get(get_skin_name(engine_data, locale))
+        background_data = backgrounds_catalog(source, locale).get(
+            engine_data["background_name"]
+        )
+        if None in (skin_data, background_data):
+            raise _missing_resource(engine.name)
+
+        overlay = {}
+        if skin_data is not engine.skin:
+            overlay["skin"] = skin_data
+        if background_data is not engine.background:
+            overlay["background"] = background_data
+        compiled_data_list.append(
+            (
+                engine.model_copy(update=overlay) if overlay else engine,
+                engine_data.get("engine_sort_order", float("inf")),
+            )
+        )
+    return compiled_data_list
+
+
+class Catalog:
+    """
+    A compiled catalog: the items in display order plus a name index.
+    Iterates, indexes and pages like the list it wraps.
+    """
+
+    def __init__(self, items: list):
+        self.items = items
+        self.by_name = {item.name: item for item in items}
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def get(self, name: str):
+        return self.by_name.get(name)
+
+
+class SkinCatalog(Catalog):
+    """
+    Skins are also looked up by (theme, engine, locale), see resolve().
+    """
+
+    def __init__(self, skins: list[tuple[SkinItem, list[str], str, str | None]]):
+        super().__init__([skin for skin, _, _, _ in skins])
+        self.engines = {skin.name: engines for skin, engines, _, _ in skins}
+        # in catalog order, each once
+        self.themes = tuple(dict.fromkeys(theme for _, _, theme, _ in skins))
+        self._themed = [(skin, theme, locale) for skin, _, theme, locale in skins]
+        # (theme, engine) -> ({locale: skin}, first matching skin), filled by resolve()
+        self._by_theme: dict[
+            tuple[str, str], tuple[dict[str | None, SkinItem], SkinItem]
+        ] = {}
+
+    def works_with(self, skin: SkinItem, engine: str) -> bool:
+        # skins without an engine list work with every engine
+        engines = self.engines[skin.name]
+        return engines is None or engine in engines
+
+    def for_engine(self, engine: str) -> list[SkinItem]:
+        return [skin for skin in self.items if self.works_with(skin, engine)]
+
+    def resolve(self, theme: str, engine: str, locale: str) -> SkinItem:
+        """
+        Skin for a theme and engine: the one for `locale`, else a global
+        (locale-less) one, else the first. Raises KeyError if none match.
+        """
+        entry = self._by_theme.get((theme, engine))
+        if entry is None:
+            by_locale: dict[str | None, SkinItem] = {}
+            for skin, skin_theme, skin_locale in self._themed:
+                if skin_theme == theme and self.works_with(skin, engine):
+                    by_locale.setdefault(skin_locale, skin)
+            if not by_locale:
+                raise KeyError((theme, engine))
+            # the first matching skin is the first one stored
+            entry = self._by_theme.setdefault(
+                (theme, engine), (by_locale, next(iter(by_locale.values())))
+            )
+        by_locale, first = entry
+        return by_locale.get(locale) or by_locale.get(None) or first
+
+
+class ParticleCatalog(Catalog):
+    def __init__(self, particles: list[tuple[ParticleItem, bool]]):
+        super().__init__([particle for particle, _ in particles])
+        self.engine_specific = {
+            particle.name: engine_specific for particle, engine_specific in particles
+        }
+
+
+@single_flight(lambda source=None: "skins_index")
+def skins_catalog(source: str = None) -> SkinCatalog:
+    return SkinCatalog(compile_skins_list(source))
+
+
+@single_flight(lambda source=None: "particles_index")
+def particles_catalog(source: str = None) -> ParticleCatalog:
+    return ParticleCatalog(compile_particles_list(source))
+
+
+@single_flight(lambda source=None: "effects_index")
+def effects_catalog(source: str = None) -> Catalog:
+    return Catalog(compile_effects_list(source))
+
+
+@single_flight(_locale_key("backgrounds", "_index"))
+def backgrounds_catalog(source: str = None, locale: str = "en") -> Catalog:
+    return Catalog(compile_backgrounds_list(source, locale))
+
+
+@single_flight(lambda source=None, locale="en": f"engines_{locale}_index")
+def engines_catalog(source: str = None, locale: str = "en") -> Catalog:
+    # compile_engines_list is already sorted
+    return Catalog([engine for engine, _ in compile_engines_list(source, locale)])
+
+
+def get_catalog(item_type: str, source: str = None, locale: str = "en") -> Catalog | None:
+    """
+    Catalog for a /sonolus/{item_type} route, None for unknown types.
+    """
+    match item_type:
+        case "engines":
+            return engines_catalog(source, locale)
+        case "skins":
+            return skins_catalog(source)
+        case "backgrounds":
+            return backgrounds_catalog(source, locale)
+        case "effects":
+            return effects_catalog(source)
+        case "particles":
+            return particles_catalog(source)
+    return None
+
+
+def compile_all(source: str, locales: tuple[str, ...] = SUPPORTED_LOCALES):
+    """
+    Compile every catalog for every locale, so they are resident before
+    the first request. A catalog that fails is reported and skipped; its
+    routes will raise on first use as before.
+    """
+    jobs = [
+        (compile_banner, ()),
+        (compile_static_posts_list, (source,)),
+        (effects_catalog, (source,)),
+        (particles_catalog, (source,)),
+        (skins_catalog, (source,)),
+    ]
+    for locale in locales:
+        jobs += [
+            (backgrounds_catalog, (source, locale)),
+            (engines_catalog, (source, locale)),
+            (compile_playlists_list, (source, locale)),
+        ]
+    for func, args in jobs:
+        try:
+            func(*args)
+        except Exception as e:
+            error = str(e).splitlines()[0] if str(e) else ""
+            print(f"[WARN] {func.__name__}{args[1:]} failed: {type(e).__name__}: {error}")
@@ -0,0 +1,128 @@
+import asyncio, random, time
+from typing import Awaitable, Callable, Hashable
+
+from helpers.models.api.levels import Chart, LevelList
+
+Fetch = Callable[[], Awaitable[LevelList]]
+
+
+class FeedCache:
+    """
+    In-memory cache for the anonymous level feeds on /sonolus/levels/info.
+
+    Entries are fresh for `ttl` seconds. For `stale_ttl` seconds after that
+    the old value is still served while one background task refreshes it.
+    Concurrent misses for the same key share one fetch.
+    Random sections are served from a pool of pre-fetched random charts, so
+    every request still gets its own random pick.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 15,
+        stale_ttl: float = 120,
+        random_pool: bool = True,
+        random_pool_size: int = 30,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.random_pool = random_pool
+        self.random_pool_size = random_pool_size
+
+        # key -> (fetched_at, value)
+        self._entries: dict[Hashable, tuple[float, LevelList]] = {}
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self._loading: dict[Hashable, asyncio.Task] = {}
+
+    async def _lookup(
+        self, key: Hashable, refresh: Fetch, load: Fetch | None = None
+    ) -> LevelList:
+        """
+        `refresh` rebuilds a stale entry in the background, `load` (default
+        `refresh`) fills a missing one while the request waits.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._revalidate(key, refresh)
+                return value
+        # miss, or too old to serve: fetch it now, once for every waiter
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load or refresh))
+            self._loading[key] = task
+        # a waiter going away doesn't cancel the others' fetch
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Fetch) -> LevelList:
+        try:
+            value = await load()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+        finally:
+            del self._loading[key]
+
+    def _revalidate(self, key: Hashable, refresh: Fetch):
+        if key in self._refreshing:
+            return
+
+        async def run():
+            try:
+                self._entries[key] = (time.monotonic(), await refresh())
+            except Exception:
+                pass  # keep serving the stale value, retry on the next hit
+            finally:
+                del self._refreshing[key]
+
+        self._refreshing[key] = asyncio.ensure_future(run())
+
+    async def get(self, key: Hashable, fetch: Fetch) -> LevelList:
+        """
+        Cached feed, e.g. key=("newest", staff_pick).
+        """
+        return await self._lookup(key, fetch)
+
+    async def random(self, key: Hashable, fetch: Fetch, count: int) -> LevelList:
+        """
+        `count` random charts drawn from the pool for `key`. `fetch` must
+        return a random page; it's called until the pool is full.
+        Without a pool every call goes to the backend.
+
+        A missing pool is served from one page right away and filled in the
+        background, the request only waits for one backend round trip.
+        """
+        if not self.random_pool:
+            return await fetch()
+
+        async def fill_pool() -> LevelList:
+            pool: dict[str, Chart] = {}
+            response = None
+            # sequential: identical concurrent GETs are coalesced by the
+            # backend client and would all get the same page
+            for _ in range(max(1, self.random_pool_size // 5)):
+                response = await fetch()
+                if not response.data:
+                    break
+                for chart in response.data:
+                    pool[chart.id] = chart
+                if len(pool) >= self.random_pool_size:
+                    break
+            return response.model_copy(update={"data": list(pool.values())})
+
+        async def first_page() -> LevelList:
+            response = await fetch()
+            # runs after _load stored this page, replaces it once full
+            self._revalidate(key, fill_pool)
+            return response
+
+        pool = await self._lookup(key, fill_pool, first_page)
+        return pool.model_copy(
+            update={"data": random.sample(pool.data, min(count, len(pool.data)))}
+        )
+
+    def clear(self):
+        self._entries.clear()
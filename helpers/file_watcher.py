@@ -0,0 +1,133 @@
+import os, threading, time
+
+try:
+    import watchfiles  # inotify/FSEvents/ReadDirectoryChangesW
+except ImportError:
+    watchfiles = None
+
+from helpers.data_compilers import recompile
+from helpers.repository_map import repo
+
+# files/<directory> -> catalog name in data_compilers.cached
+CATALOGS = {
+    "banner": "banner",
+    "posts": "static_posts",
+    "playlists": "playlists",
+    "effects": "effects",
+    "particles": "particles",
+    "skins": "skins",
+    "backgrounds": "backgrounds",
+    "engines": "engines",
+}
+# engines embed their skin, effect, particle and background
+DEPENDENTS = {
+    "effects": ["engines"],
+    "particles": ["engines"],
+    "skins": ["engines"],
+    "backgrounds": ["engines"],
+}
+# rebuild order, dependencies first
+ORDER = list(CATALOGS.values())
+
+
+class CatalogWatcher:
+    """
+    Watches files/ from a background thread and recompiles only the
+    catalogs whose files changed, so new or edited skins, engines, posts...
+    are picked up without a restart. Deleted files are dropped from the
+    repository.
+
+    Uses watchfiles (inotify) when it's installed, otherwise polls
+    file sizes and mtimes every `poll_interval` seconds.
+    """
+
+    def __init__(self, root: str = "files", poll_interval: float = 2, debounce: float = 0.5):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="catalog-watcher", daemon=True
+        )
+        self._thread.start()
+        mode = "inotify" if watchfiles else f"polling every {self.poll_interval}s"
+        print(f"[WATCH] Watching {self.root}/ ({mode})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        changes = self._watch() if watchfiles else self._poll()
+        for changed, deleted in changes:
+            try:
+                self.apply(changed, deleted)
+            except Exception as e:
+                print(f"[WATCH] Reload failed: {type(e).__name__}: {e}")
+
+    def _watch(self):
+        for batch in watchfiles.watch(
+            self.root,
+            stop_event=self._stop,
+            debounce=int(self.debounce * 1000),
+            yield_on_timeout=False,
+        ):
+            changed = {path for change, path in batch if change != watchfiles.Change.deleted}
+            deleted = {path for change, path in batch if change == watchfiles.Change.deleted}
+            yield changed, deleted
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _poll(self):
+        before = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            after = self._snapshot()
+            changed = {path for path, sig in after.items() if before.get(path) != sig}
+            deleted = before.keys() - after.keys()
+            before = after
+            if changed or deleted:
+                yield changed, deleted
+
+    def catalog_for(self, path: str) -> str | None:
+        relative = os.path.relpath(path, self.root)
+        directory = relative.split(os.sep, 1)[0]
+        return CATALOGS.get(directory)
+
+    def apply(self, changed: set[str], deleted: set[str]):
+        """
+        Recompile the catalogs affected by these paths, dependencies first.
+        """
+        for path in deleted:
+            repo.forget_path(path)
+
+        catalogs = set()
+        for path in changed | deleted:
+            catalog = self.catalog_for(path)
+            if catalog:
+                catalogs.add(catalog)
+                catalogs.update(DEPENDENTS.get(catalog, []))
+        if not catalogs:
+            return
+
+        start = time.perf_counter()
+        for catalog in ORDER:
+            if catalog in catalogs:
+                recompile(catalog)
+        print(
+            f"[WATCH] Reloaded {', '.join(c for c in ORDER if c in catalogs)} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
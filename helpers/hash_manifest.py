@@ -0,0 +1,174 @@
+"""
+Persistent SHA-1 manifest for repository files.
+
+Remembers the hash of every file the repository has seen together with its
+(size, mtime_ns, inode), so a restart only re-hashes files that changed.
+
+    python -m helpers.hash_manifest rebuild [--manifest PATH] [--root files]
+    python -m helpers.hash_manifest verify [--manifest PATH]
+"""
+
+import argparse, json, os, tempfile, threading
+from typing import Callable
+
+from helpers.sha1 import calculate_sha1
+
+DEFAULT_PATH = ".hash_manifest.json"
+VERSION = 1
+
+Signature = tuple[int, int, int]  # size, mtime_ns, inode
+
+
+def file_signature(path: str) -> Signature:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class HashManifest:
+    """
+    path -> (size, mtime_ns, inode, sha1), stored as JSON.
+    With path=None it only lives in memory.
+
+    Zip chain entries (a.zip|inner.zip|file) are keyed by the full chain and
+    use the outer archive's signature. Thread-safe; call save() to persist.
+    """
+
+    def __init__(self, path: str | None = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[int, int, int, str]] = {}
+        self.dirty = False
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(file: os.PathLike) -> str:
+        return os.path.abspath(file)
+
+    def load(self) -> "HashManifest":
+        if self.path is None:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable hash manifest {self.path}: {e}")
+            return self
+        if data.get("version") != VERSION:
+            return self
+        with self._lock:
+            self._entries = {
+                path: tuple(entry) for path, entry in data.get("files", {}).items()
+            }
+        return self
+
+    def save(self):
+        """
+        Atomically replace the manifest file, if anything changed.
+        """
+        with self._lock:
+            if self.path is None or not self.dirty:
+                return
+            data = {"version": VERSION, "files": dict(self._entries)}
+            self.dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def sha1(self, file: os.PathLike, compute: Callable[[], str] | None = None) -> str:
+        """
+        Known hash of `file` if it hasn't changed, otherwise hash it
+        (with `compute`, default calculate_sha1) and remember the result.
+        """
+        file = str(file)
+        key = self._key(file)
+        signature = file_signature(file.split("|")[0])
+        entry = self._entries.get(key)
+        if entry is not None and tuple(entry[:3]) == signature:
+            # Repository.prehash calls this from several threads
+            with self._lock:
+                self.stats["hits"] += 1
+            return entry[3]
+        with self._lock:
+            self.stats["misses"] += 1
+        sha1 = compute() if compute else calculate_sha1(file)
+        with self._lock:
+            self._entries[key] = (*signature, sha1)
+            self.dirty = True
+        return sha1
+
+    def forget(self, file: os.PathLike):
+        with self._lock:
+            if self._entries.pop(self._key(file), None) is not None:
+                self.dirty = True
+
+    def entries(self) -> dict[str, tuple[int, int, int, str]]:
+        with self._lock:
+            return dict(self._entries)
+
+
+def _rebuild(manifest: HashManifest, root: str) -> int:
+    # starts empty, so entries of deleted files are dropped
+    count = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            manifest.sha1(os.path.join(directory, name))
+            count += 1
+    manifest.dirty = True
+    manifest.save()
+    print(f"Hashed {count} files under {root} into {manifest.path}")
+    return 0
+
+
+def _verify(manifest: HashManifest) -> int:
+    from helpers.repository_map import ZipChainFile  # zip chains only
+
+    problems = 0
+    entries = manifest.entries()
+    for path, (*signature, sha1) in entries.items():
+        parts = path.split("|")
+        if not os.path.exists(parts[0]):
+            print(f"missing  {path}")
+            problems += 1
+            continue
+        if file_signature(parts[0]) != tuple(signature):
+            print(f"stale    {path}")
+            problems += 1
+            continue
+        if len(parts) > 1:
+            f = ZipChainFile(parts)
+            try:
+                actual = calculate_sha1(f.read())
+            finally:
+                f.close()
+        else:
+            actual = calculate_sha1(path)
+        if actual != sha1:
+            # unchanged size/mtime/inode but different content
+            print(f"mismatch {path}")
+            problems += 1
+    print(f"Checked {len(entries)} entries, {problems} problem(s)")
+    return 1 if problems else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the hash manifest.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--manifest", default=DEFAULT_PATH)
+    parser.add_argument("--root", default="files", help="directory to hash (rebuild)")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        return _rebuild(HashManifest(args.manifest), args.root)
+    return _verify(HashManifest(args.manifest).load())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
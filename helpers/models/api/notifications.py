@@ -44,6 +44,8 @@ class NotificationList(BaseModel):
         for notification in self.notifications:
             posts.append(notification.to_post(request))
 
+        return posts
+
 class Notification(_BaseNotification):
     user_id: str
     content: str
@@ -1,4 +1,4 @@
-import collections.abc, random, re
+import collections.abc, functools, itertools, random, re
 
 
 def flatten(arr: collections.abc.Iterable):
@@ -229,13 +229,16 @@ FACES = [
 ]
 
 
-def map_o_to_owo(input: Word) -> Word:
-    replacement: str
-    if random.randint(0, 2) > 0:
-        replacement = "owo"
-    else:
-        replacement = "o"
-    return input.replace(O_TO_OWO, replacement)
+def map_o_to_owo_pre(rng: random.Random):
+    def map_o_to_owo(input: Word) -> Word:
+        replacement: str
+        if rng.randint(0, 2) > 0:
+            replacement = "owo"
+        else:
+            replacement = "o"
+        return input.replace(O_TO_OWO, replacement)
+
+    return map_o_to_owo
 
 
 def map_ew_to_uwu(input: Word) -> Word:
@@ -269,15 +272,17 @@ def map_brackets_to_star_trails_pre(symbols: bool):
     return map_brackets_to_star_trails
 
 
-def map_period_comma_exclamation_semicolon_to_kaomojis_pre(symbols: bool):
+def map_period_comma_exclamation_semicolon_to_kaomojis_pre(
+    symbols: bool, rng: random.Random
+):
     def map_period_comma_exclamation_semicolon_to_kaomojis(input: Word) -> Word:
         if symbols:
             return input.replace_with_func_single(
                 PERIOD_COMMA_EXCLAMATION_SEMICOLON_TO_KAOMOJIS_FIRST,
-                lambda: f" {FACES[random.randint(0, len(FACES) - 1)]}",
+                lambda: f" {FACES[rng.randint(0, len(FACES) - 1)]}",
             ).replace_with_func_single(
                 PERIOD_COMMA_EXCLAMATION_SEMICOLON_TO_KAOMOJIS_SECOND,
-                lambda: f" {FACES[random.randint(0, len(FACES) - 1)]}",
+                lambda: f" {FACES[rng.randint(0, len(FACES) - 1)]}",
             )
         return input
 
@@ -492,26 +497,13 @@ def interleave_arrays(a: list, b: list) -> list:
     return arr
 
 
-def owoify(
-    source: str, level: int = 0, locale: str = "en", symbols: bool = True
-) -> str:
+def mapping_lists(
+    locale: str, symbols: bool, rng: random.Random
+) -> tuple[list, list, list, list]:
     """
-    Pass the source string and the desired level of owoness to owoify it.
-    ----
-    Inputs:
-    - source (str) : The source string
-    - level (int) : How much it should be owoified. 0-2, 0 being low and 2 being high
-    - symbols (bool) : Whether to replace symbols (such as `"<", ">", "[", "]", "{", "}", ".", ",", ";", "!"`)
-    ----
-    Outputs:
-    - str : The owoified string.
-    ----
-    Raises:
-    - RuntimeError : Level is not supported
+    The rules of a locale: specific words, uvu (level 2), uwu (level 1)
+    and owo (level 0). Random choices are drawn from `rng`.
     """
-    word_matches = WORD_REGEX.findall(source)
-    space_matches = SPACE_REGEX.findall(source)
-
     if locale == "en":
         SPECIFIC_WORD_MAPPING_LIST = [
             map_fuc_to_fwuc,
@@ -535,7 +527,7 @@ def owoify(
             map_feel_to_fell,
         ]
         UVU_MAPPING_LIST = [
-            map_o_to_owo,
+            map_o_to_owo_pre(rng),
             map_ew_to_uwu,
             map_hey_to_hay,
             map_dead_to_ded,
@@ -543,7 +535,7 @@ def owoify(
         ]
         UWU_MAPPING_LIST = [
             map_brackets_to_star_trails_pre(symbols),
-            map_period_comma_exclamation_semicolon_to_kaomojis_pre(symbols),
+            map_period_comma_exclamation_semicolon_to_kaomojis_pre(symbols, rng),
             map_that_to_dat,
             map_th_to_f,
             map_le_to_wal,
@@ -575,8 +567,8 @@ def owoify(
         SPECIFIC_WORD_MAPPING_LIST = []
         UVU_MAPPING_LIST = [
             map_brackets_to_star_trails_pre(symbols),
-            map_period_comma_exclamation_semicolon_to_kaomojis_pre(symbols),
-            map_o_to_owo,
+            map_period_comma_exclamation_semicolon_to_kaomojis_pre(symbols, rng),
+            map_o_to_owo_pre(rng),
         ]  # level 2
         UWU_MAPPING_LIST = [map_ll_to_ww, map_ry_to_wwy]  # level 1
         OWO_MAPPING_LIST = [
@@ -588,6 +580,49 @@ def owoify(
     else:
         raise ValueError(f"Unsupported locale {locale}")
 
+    return (
+        SPECIFIC_WORD_MAPPING_LIST,
+        UVU_MAPPING_LIST,
+        UWU_MAPPING_LIST,
+        OWO_MAPPING_LIST,
+    )
+
+
+def level_rules(locale: str, level: int, symbols: bool, rng: random.Random) -> list:
+    """
+    Every rule applied to a word at this level, in order.
+    """
+    specific, uvu, uwu, owo = mapping_lists(locale, symbols, rng)
+    match level:
+        case 0:
+            return specific + owo
+        case 1:
+            return specific + uwu + owo
+        case 2:
+            return specific + uvu + uwu + owo
+    raise RuntimeError("The specified owoify level is not supported.")
+
+
+def owoify_reference(
+    source: str, level: int = 0, locale: str = "en", symbols: bool = True
+) -> str:
+    """
+    The Word pipeline owoify is compiled from: every rule runs on every
+    word. Same inputs and output as owoify, kept to check it against
+    (scripts/owoify_golden.py).
+    """
+    word_matches = WORD_REGEX.findall(source)
+    space_matches = SPACE_REGEX.findall(source)
+    # str seeds are hashed with sha512, stable across processes
+    rng = random.Random(source)
+
+    (
+        SPECIFIC_WORD_MAPPING_LIST,
+        UVU_MAPPING_LIST,
+        UWU_MAPPING_LIST,
+        OWO_MAPPING_LIST,
+    ) = mapping_lists(locale, symbols, rng)
+
     words = [Word(s) for s in word_matches]
     spaces = [Word(s) for s in space_matches]
 
@@ -623,6 +658,164 @@ def owoify(
     return "".join(result_strings)
 
 
+class _RecordingRandom(random.Random):
+    """
+    Stands in for the per-call Random while an engine is compiled: records
+    the randint calls of each rule.
+    """
+
+    def __init__(self):
+        super().__init__(0)
+        self.calls: list[tuple[int, int]] = []
+
+    def randint(self, a: int, b: int) -> int:
+        self.calls.append((a, b))
+        return a
+
+
+class _PatternRecorder:
+    """
+    Stands in for a Word while an engine is compiled: records the patterns
+    a rule searches for.
+    """
+
+    def __init__(self):
+        self.patterns: list[re.Pattern] = []
+
+    def replace(self, search_value: re.Pattern, replace_value: str, replace_replaced_words: bool = False):
+        self.patterns.append(search_value)
+        return self
+
+    def replace_with_func_single(self, search_value: re.Pattern, func, replace_replaced_words: bool = False):
+        func()  # Word calls it whether or not the pattern matches
+        self.patterns.append(search_value)
+        return self
+
+    def replace_with_func_multiple(self, search_value: re.Pattern, func, replace_replaced_words: bool = False):
+        self.patterns.append(search_value)
+        return self
+
+
+def _union(patterns: list[re.Pattern]) -> re.Pattern | None:
+    """
+    One regex that matches somewhere iff one of `patterns` does.
+    """
+    patterns = list(dict.fromkeys(patterns))
+    if not patterns:
+        return None
+    if len(patterns) == 1:
+        return patterns[0]
+    return re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern in patterns), patterns[0].flags
+    )
+
+
+class OwoifyEngine:
+    """
+    owoify for one (locale, level, symbols).
+
+    Every rule is a few regex passes over a Word, but on most words most
+    rules can't match. The patterns each rule searches for are merged into
+    one regex per rule, and the patterns of all the rules still to run into
+    another, so a rule only runs when it can match and a word stops being
+    processed once nothing else can. A rule that can't match leaves the
+    word untouched; its random draws are still made, so the output is the
+    same as owoify_reference.
+    """
+
+    def __init__(self, locale: str, level: int, symbols: bool):
+        self.locale = locale
+        self.level = level
+        self.symbols = symbols
+
+        recording_rng = _RecordingRandom()
+        rule_patterns: list[list[re.Pattern]] = []
+        # randint arguments each rule draws, whatever the word
+        self.draws: list[tuple[tuple[int, int], ...]] = []
+        for rule in level_rules(locale, level, symbols, recording_rng):
+            recorder = _PatternRecorder()
+            recording_rng.calls = []
+            rule(recorder)
+            rule_patterns.append(recorder.patterns)
+            self.draws.append(tuple(recording_rng.calls))
+
+        self.rules = [_union(patterns) for patterns in rule_patterns]
+        # remaining[i]: can any rule from i on still change the word
+        self.remaining = [
+            _union([pattern for patterns in rule_patterns[i:] for pattern in patterns])
+            for i in range(len(rule_patterns))
+        ]
+        self.remaining_draws = [
+            tuple(draw for draws in self.draws[i:] for draw in draws)
+            for i in range(len(self.draws))
+        ]
+
+    def owoify_word(self, text: str, rules: list, rng: random.Random) -> str:
+        word: Word | None = None
+        check_remaining = True
+        for i, pattern in enumerate(self.rules):
+            if check_remaining:
+                remaining = self.remaining[i]
+                if remaining is None or remaining.search(text) is None:
+                    for a, b in self.remaining_draws[i]:
+                        rng.randint(a, b)
+                    break
+                check_remaining = False
+            if pattern is None or pattern.search(text) is None:
+                for a, b in self.draws[i]:
+                    rng.randint(a, b)
+                continue
+            if word is None:
+                word = Word(text)
+            word = rules[i](word)
+            if word.word != text:
+                text = word.word
+                check_remaining = True
+        return text
+
+    def __call__(self, source: str) -> str:
+        # str seeds are hashed with sha512, stable across processes
+        rng = random.Random(source)
+        rules = level_rules(self.locale, self.level, self.symbols, rng)
+        words = [
+            text if URL_REGEX.fullmatch(text) else self.owoify_word(text, rules, rng)
+            for text in WORD_REGEX.findall(source)
+        ]
+        spaces = SPACE_REGEX.findall(source)
+        return "".join(
+            word + space
+            for word, space in itertools.zip_longest(words, spaces, fillvalue="")
+        )
+
+
+@functools.cache
+def get_owoify_engine(locale: str, level: int, symbols: bool) -> OwoifyEngine:
+    return OwoifyEngine(locale, level, symbols)
+
+
+def owoify(
+    source: str, level: int = 0, locale: str = "en", symbols: bool = True
+) -> str:
+    """
+    Pass the source string and the desired level of owoness to owoify it.
+    ----
+    Inputs:
+    - source (str) : The source string
+    - level (int) : How much it should be owoified. 0-2, 0 being low and 2 being high
+    - symbols (bool) : Whether to replace symbols (such as `"<", ">", "[", "]", "{", "}", ".", ",", ";", "!"`)
+    ----
+    The random choices (o -> owo, kaomojis) are seeded from the source
+    string, so the same input always gives the same output.
+    ----
+    Outputs:
+    - str : The owoified string.
+    ----
+    Raises:
+    - RuntimeError : Level is not supported
+    """
+    return get_owoify_engine(locale, level, symbols)(source)
+
+
 def uwuify(source: str, locale: str = "en") -> str:
     """
     Equivalent to owoify at level 1
@@ -637,32 +830,131 @@ def uvuify(source: str, locale: str = "en") -> str:
     return owoify(source=source, level=2, locale=locale)
 
 
+OWOIFY_LEVELS = {"owo": 0, "uwu": 1, "uvu": 2}
+OWOIFY_CACHE_SIZE = 16384
+
+# (source, level, locale, symbols) -> owoified; owoify is deterministic
+_owoify_cached = functools.lru_cache(maxsize=OWOIFY_CACHE_SIZE)(owoify)
+# same, for strings known at startup (locale messages); never evicted
+_static_uwu: dict[tuple[str, int, str, bool], str] = {}
+
+
+def configure_owoify_cache(max_entries: int | None = None):
+    """
+    Resize (and empty) the handle_uwu cache.
+    """
+    global _owoify_cached
+    _owoify_cached = functools.lru_cache(maxsize=max_entries or OWOIFY_CACHE_SIZE)(
+        owoify
+    )
+
+
+def owoify_cache_stats() -> dict:
+    info = _owoify_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "static": len(_static_uwu),
+    }
+
+
+def precompute_static_uwu(strings_by_locale: dict[str, list[str]]) -> int:
+    """
+    Owoify strings that never change, such as locale messages, at every
+    level. They are served by handle_uwu without going through the LRU.
+    """
+    count = 0
+    for locale, strings in strings_by_locale.items():
+        for level in OWOIFY_LEVELS.values():
+            for source in strings:
+                _static_uwu[(source, level, locale, True)] = owoify(
+                    source, level, locale, True
+                )
+                count += 1
+    return count
+
+
 def handle_uwu(source: str, locale: str, uwu_level: str, symbols: bool = True) -> str:
-    if uwu_level == "off":
+    level = OWOIFY_LEVELS.get(uwu_level)
+    if level is None:  # "off"
         return source
-    elif uwu_level == "owo":
-        return owoify(source, locale=locale, symbols=symbols)
-    elif uwu_level == "uwu":
-        return owoify(source, level=1, locale=locale, symbols=symbols)
-    elif uwu_level == "uvu":
-        return owoify(source, level=2, locale=locale, symbols=symbols)
-    return source
+    static = _static_uwu.get((source, level, locale, symbols))
+    if static is not None:
+        return static
+    return _owoify_cached(source, level, locale, symbols)
+
+
+def handle_uwu_batch(
+    texts: collections.abc.Iterable[tuple[str, bool]], locale: str, uwu_level: str
+) -> dict[tuple[str, bool], str]:
+    """
+    Owoify many (text, symbols) pairs, each distinct pair once.
+    """
+    return {
+        (source, symbols): handle_uwu(source, locale, uwu_level, symbols=symbols)
+        for source, symbols in dict.fromkeys(texts)
+    }
+
+
+UWU_ITEM_FIELDS = ("title", "author", "subtitle", "description")
+# author is left without kaomojis and star trails
+UWU_SYMBOL_FIELDS = frozenset({"title", "subtitle", "description"})
+
+
+def _uwu_fields(item) -> dict[str, str]:
+    if isinstance(item, dict):
+        values = {key: item.get(key) for key in UWU_ITEM_FIELDS}
+    else:  # pydantic model
+        values = {key: getattr(item, key, None) for key in UWU_ITEM_FIELDS}
+    return {key: value for key, value in values.items() if isinstance(value, str)}
 
-# TODO: typevars or something
 
 def handle_item_uwu(source_items: list, locale: str, uwu_level: str) -> list:
+    """
+    Copies of the items (dicts or models) with their title, author,
+    subtitle and description owoified. The strings of the whole list are
+    collected first, so a string repeated across items is owoified once.
+    """
+    if uwu_level not in OWOIFY_LEVELS:
+        fields = [{} for _ in source_items]
+        uwu = {}
+    else:
+        fields = [_uwu_fields(item) for item in source_items]
+        uwu = handle_uwu_batch(
+            (
+                (value, key in UWU_SYMBOL_FIELDS)
+                for item_fields in fields
+                for key, value in item_fields.items()
+            ),
+            locale,
+            uwu_level,
+        )
+
     returned = []
-    for item in source_items:
-        item = item.copy()
-        include_symbols = ["title", "subtitle", "description"]
-        always_assume_en = ["title", "subtitle", "description"]
-        for key in ["title", "author", "subtitle", "description"]:
-            if key in item:
-                item[key] = handle_uwu(
-                    item[key],
-                    locale if locale not in always_assume_en else "en",
-                    uwu_level,
-                    symbols=key in include_symbols,
-                )
-        returned.append(item)
+    for item, item_fields in zip(source_items, fields):
+        update = {
+            key: uwu[(value, key in UWU_SYMBOL_FIELDS)]
+            for key, value in item_fields.items()
+        }
+        if isinstance(item, dict):
+            returned.append({**item, **update})
+        else:
+            returned.append(item.model_copy(update=update))
     return returned
+
+
+def handle_item_lists_uwu(item_lists: list[list], locale: str, uwu_level: str) -> list[list]:
+    """
+    handle_item_uwu over several lists (e.g. the sections of a page) at
+    once, so strings shared between them are owoified once too.
+    """
+    items = iter(
+        handle_item_uwu(
+            [item for items in item_lists for item in items], locale, uwu_level
+        )
+    )
+    return [[next(items) for _ in item_list] for item_list in item_lists]
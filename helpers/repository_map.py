@@ -1,4 +1,5 @@
 from helpers.sha1 import calculate_sha1
+from helpers.hash_manifest import HashManifest
 
 from typing import Optional, Union, IO
 from helpers.models.sonolus.misc import SRL
@@ -6,35 +7,197 @@ from helpers.models.sonolus.misc import SRL
 from pathlib import Path
 from io import BytesIO
 from zipfile import ZipFile
+from contextlib import ExitStack, closing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import os
 import functools
+import threading
+import mimetypes
+
+
+class ZipChainFile:
+    """
+    A file read through a chain of ZIPs, opened for streaming.
+    Example: path/to/a.zip|inner.zip|file.png
+
+    Every member is opened straight from its parent archive, so nothing is
+    buffered in memory. `size` is the uncompressed size of the last member.
+    """
+
+    def __init__(self, parts: list[str], archive: ZipFile | None = None):
+        """
+        `archive` is an already open ZipFile for parts[0] (see ZipCache);
+        it is shared, so it's left open on close().
+        """
+        self._stack = ExitStack()
+        try:
+            if archive is None:
+                # First part is always a real file on disk
+                current = self._stack.enter_context(open(parts[0], "rb"))
+                self.size = os.fstat(current.fileno()).st_size
+            for i, part in enumerate(parts[1:]):
+                # Open previous member as ZIP
+                if i == 0 and archive is not None:
+                    zip_file = archive
+                else:
+                    zip_file = self._stack.enter_context(ZipFile(current))
+                try:
+                    info = zip_file.getinfo(part)
+                except KeyError:
+                    raise FileNotFoundError(f"{part} not found in zip chain")
+                current = self._stack.enter_context(zip_file.open(info))
+                self.size = info.file_size
+        except BaseException:
+            self._stack.close()
+            raise
+        self._file = current
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int):
+        # compressed members seek by decompressing up to offset
+        self._file.seek(offset)
+
+    def close(self):
+        self._stack.close()
+
+
+class ZipCache:
+    """
+    Caches for zip chain reads:
+    - decompressed members, LRU within a byte budget (`max_bytes`)
+    - open ZipFile handles for the outer archives on disk, so their
+      central directory is parsed once (`max_archives`)
+
+    Entries are keyed by the outer archive's size and mtime, so a replaced
+    archive is never served from cache. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_archives: int = 32):
+        self.max_bytes = max_bytes
+        self.max_archives = max_archives
+        self._lock = threading.Lock()
+        self._data: OrderedDict[tuple, bytes] = OrderedDict()
+        self._size = 0
+        # path -> (stat signature, ZipFile)
+        self._archives: OrderedDict[str, tuple[tuple[int, int], ZipFile]] = (
+            OrderedDict()
+        )
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def archive(self, path: str) -> ZipFile:
+        signature = self._signature(path)
+        with self._lock:
+            cached = self._archives.get(path)
+            if cached and cached[0] == signature:
+                self._archives.move_to_end(path)
+                return cached[1]
+        # members still being read keep the old file open until they close
+        zip_file = ZipFile(path)
+        with self._lock:
+            old = self._archives.pop(path, None)
+            self._archives[path] = (signature, zip_file)
+            while len(self._archives) > self.max_archives:
+                _, (_, evicted) = self._archives.popitem(last=False)
+                evicted.close()
+        if old:
+            old[1].close()
+        return zip_file
+
+    def open(self, parts: list[str]) -> ZipChainFile:
+        try:
+            return ZipChainFile(parts, self.archive(parts[0]))
+        except ValueError:
+            # the shared handle was evicted and closed under us
+            return ZipChainFile(parts)
+
+    def read(self, parts: list[str]) -> bytes:
+        key = (tuple(parts), self._signature(parts[0]))
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return data
+            self._stats["misses"] += 1
+
+        with closing(self.open(parts)) as f:
+            data = f.read()
+
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._data:
+                    self._data[key] = data
+                    self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._data.popitem(last=False)
+                    self._size -= len(evicted)
+                    self._stats["evictions"] += 1
+        return data
+
+    def configure(self, max_bytes: int | None = None, max_archives: int | None = None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_archives is not None:
+                self.max_archives = max_archives
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+            while len(self._archives) > self.max_archives:
+                _, (_, evicted) = self._archives.popitem(last=False)
+                evicted.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._data),
+                "bytes": self._size,
+                "archives": len(self._archives),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+            for _, zip_file in self._archives.values():
+                zip_file.close()
+            self._archives.clear()
 
 
 class Repository:
     def __init__(self):
         self._map = {}
+        self.zip_cache = ZipCache()
+        # known hashes of unchanged files, made persistent by the app
+        self.manifest = HashManifest(None)
+        # normalized path -> hash, the reverse of _map for files on disk
+        self._paths: dict[str, str] = {}
+        # hash -> {normalized path: path} of every file with that content,
+        # identical assets (e.g. a skin and its -EN copy) share one hash
+        self._owners: dict[str, dict[str, str]] = {}
+        # compile functions add files from many executor threads at once
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _path_key(file: os.PathLike) -> str:
+        return os.path.abspath(file)
 
-    @functools.lru_cache(maxsize=None)
     def _read_from_zip_chain(self, parts: list[str]) -> bytes:
         """
         Recursively reads a file through a chain of ZIPs.
         Example: path/to/a.zip|inner.zip|file.png
         """
-        current_bytes = None
-
-        for i, part in enumerate(parts):
-            if i == 0:
-                # First part is always a real file on disk
-                with open(part, "rb") as f:
-                    current_bytes = f.read()
-            else:
-                # Open previous bytes as ZIP
-                with ZipFile(BytesIO(current_bytes)) as zip_file:
-                    try:
-                        current_bytes = zip_file.read(zip_file.getinfo(part))
-                    except KeyError:
-                        raise FileNotFoundError(f"{part} not found in zip chain")
-        return current_bytes
+        return self.zip_cache.read(parts)
 
     def add_file(
         self, file: os.PathLike, error_on_file_nonexistent: bool = True
@@ -42,31 +205,90 @@ class Repository:
         if not error_on_file_nonexistent:
             if not os.path.exists(file):
                 return None
-        hash = self.get_hash_from_file_path(file)
-        if hash:
-            self._map.pop(hash, 0)
         if "|" in str(file):
-            file_data = self._read_from_zip_chain(str(file).split("|"))
-            sha1 = calculate_sha1(file_data)
+            compute = lambda: calculate_sha1(
+                self._read_from_zip_chain(str(file).split("|"))
+            )
         else:
-            sha1 = calculate_sha1(file)
+            compute = lambda: calculate_sha1(file)
+        sha1 = self.manifest.sha1(file, compute)
         file_path = str(file)
-        if sha1 not in self._map.keys():
-            self._map[sha1] = {"hash": sha1, "file": file_path}
+        path_key = self._path_key(file)
+        with self._lock:
+            old_hash = self._paths.get(path_key)
+            if old_hash and old_hash != sha1:
+                # the file changed, other paths may still have the old content
+                self._release(path_key, old_hash)
+            self._paths[path_key] = sha1
+            self._owners.setdefault(sha1, {})[path_key] = file_path
+            if sha1 not in self._map:
+                self._map[sha1] = {"hash": sha1, "file": file_path}
         return sha1
 
+    def _release(self, path_key: str, sha1: str):
+        """
+        `path_key` no longer has content `sha1`. The hash is dropped with its
+        last path; if the path was the one served, another path takes over.
+        Call with the lock held.
+        """
+        owners = self._owners.get(sha1)
+        if owners is None:
+            return
+        owners.pop(path_key, None)
+        item = self._map.get(sha1)
+        if not owners:
+            del self._owners[sha1]
+            if item and isinstance(item["file"], str):
+                del self._map[sha1]
+        elif item and isinstance(item["file"], str):
+            if self._path_key(item["file"]) == path_key:
+                self._map[sha1] = {"hash": sha1, "file": next(iter(owners.values()))}
+
+    def prehash(self, root: str, workers: int = 8) -> int:
+        """
+        Hash every file under `root` into the manifest on a thread pool
+        (hashlib releases the GIL), so the compile functions' add_file calls
+        don't hash one file at a time. Nothing is added to the repository.
+        Returns the number of files.
+        """
+        paths = [
+            os.path.join(directory, name)
+            for directory, _, files in os.walk(root)
+            for name in files
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self.manifest.sha1, paths))
+        return len(paths)
+
+    def forget_path(self, file: os.PathLike):
+        """
+        Drop a deleted file: its path, and its hash unless another path
+        still has the same content.
+        """
+        path_key = self._path_key(file)
+        with self._lock:
+            sha1 = self._paths.pop(path_key, None)
+            if sha1:
+                self._release(path_key, sha1)
+        self.manifest.forget(file)
+
     def add_bytes(self, data: Union[IO[bytes], bytes]):
         """
         Warning: cannot be updated!
         """
         sha1 = calculate_sha1(data)
-        if sha1 not in self._map.keys():
-            self._map[sha1] = {"hash": sha1, "file": data}
+        with self._lock:
+            if sha1 not in self._map:
+                self._map[sha1] = {"hash": sha1, "file": data}
 
     def pop_hash(self, hash: str) -> Optional[bytes]:
         file_data = self.get_file(hash)
         if file_data:
-            del self._map[hash]
+            with self._lock:
+                self._map.pop(hash, None)
+                for path_key in self._owners.pop(hash, {}):
+                    if self._paths.get(path_key) == hash:
+                        del self._paths[path_key]
         return file_data
 
     def update_file(self, file: os.PathLike):
@@ -76,15 +298,36 @@ class Repository:
         self.add_file(file)
 
     def get_hash_from_file_path(self, file: os.PathLike) -> Optional[str]:
-        input_path = os.path.abspath(file)
-        for sha1, data in self._map.copy().items():
-            if type(data["file"]) != str:
-                continue
-            stored_path = os.path.abspath(data["file"])
-            if input_path == stored_path:
-                return sha1
+        sha1 = self._paths.get(self._path_key(file))
+        if sha1 in self._map:
+            return sha1
         return None
 
+    def get_file_path(self, hash: str) -> Optional[str]:
+        """
+        Path of the file on disk, if the hash is a plain file
+        (not a zip member or in-memory data).
+        """
+        item = self._map.get(hash, None)
+        if not item or not isinstance(item["file"], (str, Path)):
+            return None
+        file_path = str(item["file"])
+        if "|" in file_path:
+            return None
+        return file_path
+
+    def get_zip_chain(self, hash: str) -> Optional[list[str]]:
+        item = self._map.get(hash, None)
+        if not item or not isinstance(item["file"], (str, Path)):
+            return None
+        file_path = str(item["file"])
+        if "|" not in file_path:
+            return None
+        return file_path.split("|")
+
+    def open_zip_chain(self, hash: str) -> ZipChainFile:
+        return self.zip_cache.open(self.get_zip_chain(hash))
+
     def get_file(self, hash: str) -> Optional[bytes]:
         item = self._map.get(hash, None)
         if not item:
@@ -107,6 +350,21 @@ class Repository:
             file_data = file
         return file_data
 
+    def has_hash(self, hash: str) -> bool:
+        return hash in self._map
+
+    def get_content_type(self, hash: str) -> str:
+        """
+        Guessed from the file name (the last member for zip chains).
+        Extensionless Sonolus data files are served as octet-stream.
+        """
+        file = self._map[hash]["file"]
+        if isinstance(file, (str, Path)):
+            content_type, _ = mimetypes.guess_type(str(file).split("|")[-1])
+            if content_type:
+                return content_type
+        return "application/octet-stream"
+
     @functools.lru_cache(maxsize=None)
     def get_srl(self, hash: str) -> Optional[SRL]:
         if hash in self._map.keys():
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+from helpers.data_compilers import on_clear_compile_cache
+
+# engines embed their skin, effect, particle and background
+EMBEDDED_IN_ENGINES = frozenset({"skins", "effects", "particles", "backgrounds"})
+
+
+class ResponseCache:
+    """
+    Serialized JSON bodies of the static item routes (skins, engines,
+    effects, particles, backgrounds), keyed by everything the response
+    depends on. Keys start with (route, item_type, ...), e.g.
+    ("list", "skins", locale, uwu, engine, page).
+
+    Entries of an item type are dropped when its catalog is cleared or
+    recompiled. LRU, at most `max_entries`. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        # bumped on every invalidation, see put()
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return body
+
+    def put(self, key: tuple, body: bytes, generation: int):
+        """
+        Store a body built from catalogs read at `generation`. Dropped if
+        the catalogs were invalidated since, it could be stale.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, specific: str | None = None):
+        with self._lock:
+            self.generation += 1
+            if specific is None:
+                self._entries.clear()
+                return
+            # cache keys look like "skins", "backgrounds_en", "engines_en_index"
+            item_type = specific.split("_", 1)[0]
+            item_types = {item_type}
+            if item_type in EMBEDDED_IN_ENGINES:
+                item_types.add("engines")
+            for key in [key for key in self._entries if key[1] in item_types]:
+                del self._entries[key]
+
+
+response_cache = ResponseCache()
+on_clear_compile_cache(response_cache.invalidate)
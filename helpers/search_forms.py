@@ -0,0 +1,311 @@
+import functools
+import json
+import re
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from helpers.data_helpers import create_server_form, ServerFormOptionsFactory
+from helpers.owoify import handle_uwu
+from locales.locale import Locale
+
+# same output as FastAPI's JSONResponse
+JSON_ARGS = {"ensure_ascii": False, "allow_nan": False, "separators": (",", ":")}
+
+_encode = json.JSONEncoder(**JSON_ARGS).encode
+_HOLE = re.compile(r'"\\u0000(\w+)\\u0000"')
+
+
+class Fragment(bytes):
+    """
+    Already serialized JSON, spliced as-is by render_json().
+    """
+
+
+def _has_fragment(values) -> bool:
+    return any(
+        isinstance(value, Fragment)
+        or (isinstance(value, list) and any(isinstance(v, Fragment) for v in value))
+        for value in values
+    )
+
+
+def render_json(content) -> bytes:
+    """
+    json.dumps(jsonable_encoder(content)), except Fragments (in the top-level
+    dict or its lists) aren't encoded again.
+    """
+    if isinstance(content, Fragment):
+        return content
+    if isinstance(content, dict) and _has_fragment(content.values()):
+        return (
+            b"{"
+            + b",".join(
+                _encode(str(key)).encode() + b":" + render_json(value)
+                for key, value in content.items()
+            )
+            + b"}"
+        )
+    if isinstance(content, list) and _has_fragment(content):
+        return b"[" + b",".join(render_json(value) for value in content) + b"]"
+    return _encode(jsonable_encoder(content)).encode()
+
+
+def json_response(content) -> Response:
+    return Response(content=render_json(content), media_type="application/json")
+
+
+def hole(name: str) -> str:
+    """
+    Placeholder for a per-request value in a FormTemplate.
+    """
+    return f"\x00{name}\x00"
+
+
+class FormTemplate:
+    """
+    A ServerForm serialized once, with holes (see hole()) for the values
+    that change per request, usually the option defaults. render() only
+    serializes those values.
+    """
+
+    def __init__(self, form: dict):
+        parts = _HOLE.split(_encode(form))
+        self._literals = [part.encode() for part in parts[0::2]]
+        self.holes = tuple(parts[1::2])
+
+    def render(self, **values) -> Fragment:
+        out = [self._literals[0]]
+        for name, literal in zip(self.holes, self._literals[1:]):
+            out.append(_encode(values[name]).encode())
+            out.append(literal)
+        return Fragment(b"".join(out))
+
+
+def _common_options(locale: str, uwu_level: str, logged_in: bool, default) -> dict:
+    """
+    Options shared by the level search and the uploaded levels filter, by
+    query. `default(query, value)` gives each option's default.
+    """
+    loc, _ = Locale.get_messages(locale)
+    search = loc.search
+    options = {}
+    options["staff_pick"] = ServerFormOptionsFactory.server_select_option(
+        query="staff_pick",
+        name=loc.staff_pick,
+        required=False,
+        default=default("staff_pick", "default"),
+        description=handle_uwu(search.STAFF_PICK_DESC, locale, uwu_level),
+        values=[
+            {"name": "default", "title": "#DEFAULT"},
+            {"name": "off", "title": search.STAFF_PICK_OFF},
+            {"name": "true", "title": search.STAFF_PICK_TRUE},
+            {"name": "false", "title": search.STAFF_PICK_FALSE},
+        ],
+    )
+    for query, name, limit in (
+        ("keywords", "#KEYWORDS", 100),
+        ("title_includes", search.TITLE_CONTAINS, 100),
+        ("author_includes", search.AUTHOR_CONTAINS, 60),
+        ("description_includes", search.DESCRIPTION_CONTAINS, 200),
+        ("artists_includes", search.ARTISTS_CONTAINS, 100),
+        ("tags", search.TAGS_COMMA_SEPARATED, 200),
+    ):
+        options[query] = ServerFormOptionsFactory.server_text_option(
+            query=query,
+            name=name,
+            required=False,
+            default=default(query, ""),
+            placeholder=search.ENTER_TAGS if query == "tags" else search.ENTER_TEXT,
+            limit=limit,
+            shortcuts=[],
+        )
+    for query, name, min_value, max_value, value in (
+        ("min_rating", search.MIN_RATING, -999, 999, -999),
+        ("max_rating", search.MAX_RATING, -999, 999, 999),
+        ("min_likes", search.MIN_LIKES, 0, 9999, 0),
+        ("max_likes", search.MAX_LIKES, 0, 9999, 9999),
+        ("min_comments", search.MIN_COMMENTS, 0, 9999, 0),
+        ("max_comments", search.MAX_COMMENTS, 0, 9999, 9999),
+    ):
+        options[query] = ServerFormOptionsFactory.server_slider_option(
+            query=query,
+            name=name,
+            required=False,
+            default=default(query, value),
+            min_value=min_value,
+            max_value=max_value,
+            step=1,
+        )
+    if logged_in:
+        for query, name in (
+            ("liked_by", search.ONLY_LEVELS_I_LIKED),
+            ("commented_on", search.ONLY_LEVELS_I_COMMENTED_ON),
+        ):
+            options[query] = ServerFormOptionsFactory.server_toggle_option(
+                query=query,
+                name=name,
+                required=False,
+                default=default(query, False),
+            )
+    options["sort_order"] = ServerFormOptionsFactory.server_select_option(
+        query="sort_order",
+        name=search.SORT_ORDER,
+        required=False,
+        default=default("sort_order", "desc"),
+        values=[
+            {"name": "desc", "title": search.DESCENDING},
+            {"name": "asc", "title": search.ASCENDING},
+        ],
+    )
+    return options
+
+
+def _sort_by_option(
+    locale: str, uwu_level: str, default: str, sorts: list[str]
+) -> dict:
+    loc, _ = Locale.get_messages(locale)
+    titles = {
+        "published_at": loc.search.DATE_PUBLISHED,
+        "created_at": loc.search.DATE_CREATED,
+        "random": "#RANDOM",
+        "rating": loc.search.RATING,
+        "likes": loc.search.LIKES,
+        "comments": loc.search.COMMENTS,
+        "decaying_likes": loc.search.DECAYING_LIKES,
+        "abc": loc.search.TITLE_A_Z,
+    }
+    return ServerFormOptionsFactory.server_select_option(
+        query="sort_by",
+        name=loc.search.SORT_BY,
+        required=False,
+        default=default,
+        values=[{"name": sort, "title": titles[sort]} for sort in sorts],
+        description=handle_uwu(loc.search.SORT_BY_DESCRIPTION, locale, uwu_level),
+    )
+
+
+def _ordered(options: dict, order: tuple[str, ...]) -> list[dict]:
+    return [options[query] for query in order if query in options]
+
+
+LEVEL_SEARCH_ORDER = (
+    "keywords",
+    "staff_pick",
+    "min_rating",
+    "max_rating",
+    "title_includes",
+    "author_includes",
+    "description_includes",
+    "artists_includes",
+    "liked_by",
+    "commented_on",
+    "min_likes",
+    "max_likes",
+    "min_comments",
+    "max_comments",
+    "tags",
+    "sort_by",
+    "sort_order",
+)
+
+
+@functools.cache
+def level_search_form(locale: str, uwu_level: str, logged_in: bool) -> Fragment:
+    """
+    The advanced level search of /sonolus/levels/info, serialized. It has
+    no per-request values.
+    """
+    loc, _ = Locale.get_messages(locale)
+    options = _common_options(locale, uwu_level, logged_in, lambda query, value: value)
+    options["sort_by"] = _sort_by_option(
+        locale,
+        uwu_level,
+        "published_at",
+        [
+            "published_at",
+            "created_at",
+            "random",
+            "rating",
+            "likes",
+            "comments",
+            "decaying_likes",
+            "abc",
+        ],
+    )
+    form = create_server_form(
+        type="advanced",
+        title=loc.search.ADVANCED_SEARCH,
+        require_confirmation=False,
+        options=_ordered(options, LEVEL_SEARCH_ORDER),
+    )
+    return FormTemplate(form).render()
+
+
+UPLOADED_FILTER_ORDER = (
+    "page",
+    "status",
+    "staff_pick",
+    "keywords",
+    "min_rating",
+    "max_rating",
+    "title_includes",
+    "author_includes",
+    "description_includes",
+    "artists_includes",
+    "liked_by",
+    "commented_on",
+    "min_likes",
+    "max_likes",
+    "min_comments",
+    "max_comments",
+    "tags",
+    "sort_by",
+    "sort_order",
+)
+
+
+@functools.cache
+def uploaded_filter_form(locale: str, uwu_level: str, logged_in: bool) -> FormTemplate:
+    """
+    The filter of the uploaded levels playlist. Holes: title, page,
+    pageCount and every option's query (its current value).
+    """
+    loc, _ = Locale.get_messages(locale)
+    options = _common_options(
+        locale, uwu_level, logged_in, lambda query, value: hole(query)
+    )
+    options["page"] = ServerFormOptionsFactory.server_slider_option(
+        query="page",
+        name="Page",
+        default=hole("page"),
+        min_value=1,
+        max_value=hole("pageCount"),
+        step=1,
+        required=False,
+    )
+    options["status"] = ServerFormOptionsFactory.server_select_option(
+        query="status",
+        name=loc.search.VISIBILITY,
+        required=False,
+        default=hole("status"),
+        values=[
+            {"name": "ALL", "title": loc.search.VISIBILITY_ALL},
+            {"name": "PUBLIC_MINE", "title": loc.search.VISIBILITY_PUBLIC},
+            {"name": "UNLISTED", "title": loc.search.VISIBILITY_UNLISTED},
+            {"name": "PRIVATE", "title": loc.search.VISIBILITY_PRIVATE},
+        ],
+    )
+    options["sort_by"] = _sort_by_option(
+        locale,
+        uwu_level,
+        hole("sort_by"),
+        ["created_at", "random", "rating", "likes", "comments", "decaying_likes", "abc"],
+    )
+    form = create_server_form(
+        type="filter",
+        title=hole("title"),
+        require_confirmation=False,
+        options=_ordered(options, UPLOADED_FILTER_ORDER),
+    )
+    return FormTemplate(form)
@@ -1,571 +1,359 @@
 import json
-from typing import Dict, Tuple
-
-# TODO: Docstring or something like that
-
-class Loc:
-    class Playlist:
-        def __init__(self, parent: "Loc"):
-            self._parent = parent
-
-        def _get(self, key: str) -> str:
-            try:
-                return self._parent._data["playlist"][key]
-            except KeyError:
-                return self._parent._default["playlist"][key]
-
-        @property
-        def UPLOADED(self) -> str:
-            return self._get("UPLOADED")
-
-        @property
-        def UPLOADEDSUB(self) -> str:
-            return self._get("UPLOADEDSUB")
-
-    class Background:
-        def __init__(self, parent: "Loc"):
-            self._parent = parent
-
-        def _get(self, key: str) -> str:
-            try:
-                return self._parent._data["background"][key]
-            except KeyError:
-                return self._parent._default["background"][key]
-
-        @property
-        def UPLOADED(self) -> str:
-            return self._get("UPLOADED")
-
-        @property
-        def USEBACKGROUNDDESC(self) -> str:
-            return self._get("USEBACKGROUNDDESC")
-
-        @property
-        def USEBACKGROUND(self) -> str:
-            return self._get("USEBACKGROUND")
-
-        @property
-        def V1(self) -> str:
-            return self._get("V1")
-
-        @property
-        def V3(self) -> str:
-            return self._get("V3")
-
-        @property
-        def DEF_OR_V1(self) -> str:
-            return self._get("DEF_OR_V1")
-
-        @property
-        def DEF_OR_V3(self) -> str:
-            return self._get("DEF_OR_V3")
-
-        @property
-        def BACKGROUNDSELECT(self) -> str:
-            return self._get("BACKGROUNDSELECT")
-
-        @property
-        def BACKGROUNDSELECTSUB(self) -> str:
-            return self._get("BACKGROUNDSELECTSUB")
-
-    class Search:
-        def __init__(self, parent: "Loc"):
-            self._parent = parent
-
-        def _get(self, key: str) -> str:
-            try:
-                return self._parent._data["search"][key]
-            except KeyError:
-                return self._parent._default["search"][key]
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+
+def flatten(data: dict, prefix: str = "") -> Dict[str, Any]:
+    """
+    {"search": {"FILTERS": ...}} -> {"search.FILTERS": ...}. Lists (e.g.
+    mod_powers) are kept as values.
+    """
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def placeholders(message: Any) -> frozenset:
+    if not isinstance(message, str):
+        return frozenset()
+    return frozenset(
+        field for _, field, _, _ in Formatter().parse(message) if field is not None
+    )
+
+
+class _Section:
+    """
+    Messages of one section of a locale, read once from its flat table:
+    every annotated name becomes a plain attribute holding
+    table[PREFIX + name] (or the key renamed in KEYS), and the FORMATS
+    messages keep their bound str.format for the helper methods.
+    """
+
+    PREFIX = ""
+    KEYS: Dict[str, str] = {}
+    FORMATS: Tuple[str, ...] = ()
+
+    def __init__(self, table: Mapping[str, Any]):
+        self._table = table
+        cls = type(self)
+        for name in cls.__dict__.get("__annotations__", {}):
+            setattr(self, name, table[cls.PREFIX + cls.KEYS.get(name, name)])
+        self._formats = {
+            key: table[cls.PREFIX + key].format for key in cls.FORMATS
+        }
+
+
+class Loc(_Section):
+    FORMATS = (
+        "invalid_page_plural",
+        "invalid_page_singular",
+        "notifications_singular",
+        "notifications_plural",
+        "welcome",
+        "item_not_found",
+        "item_type_not_found",
+        "items_not_found",
+        "items_not_found_search",
+        "time_ago",
+        "time_ago_not_published",
+        "use_website_to_upload",
+    )
+
+    not_mod: str
+    not_mod_or_owner: str
+    is_mod: str
+    not_admin: str
+    is_admin: str
+    not_admin_or_owner: str
+    staff_pick: str
+    off: str
+    on: str
+    find_in_playlists: str
+    staff_pick_desc: str
+    non_staff_pick_desc: str
+    staff_pick_notice: str
+    staff_pick_confirm: str
+    staff_pick_add: str
+    staff_pick_remove: str
+    random_staff_pick: str
+    random_non_staff_pick: str
+    mod_powers: str
+    admin_powers: str
+    server_description: str
+    not_logged_in: str
+    not_found: str
+    unknown_error: str
+    you: str
+    default_particle: str
+    default_particle_desc: str
+    default_engine: str
+    default_engine_desc: str
+    default_skin: str
+    default_skin_desc: str
+    uwu: str
+    uwu_desc: str
+    slightly: str
+    a_lot: str
+    extreme: str
+    invalid_constant: str
+    rerate: str
+    rerate_desc: str
+
+    class Playlist(_Section):
+        PREFIX = "playlist."
+
+        UPLOADED: str
+        UPLOADEDSUB: str
+
+    class Background(_Section):
+        PREFIX = "background."
+
+        UPLOADED: str
+        USEBACKGROUNDDESC: str
+        USEBACKGROUND: str
+        V1: str
+        V3: str
+        DEF_OR_V1: str
+        DEF_OR_V3: str
+        BACKGROUNDSELECT: str
+        BACKGROUNDSELECTSUB: str
+
+    class Search(_Section):
+        PREFIX = "search."
+        KEYS = {"STAFF_PICK_DESC": "STAFF_PICK_SEARCH_DESC"}
+        FORMATS = ("FILTERS",)
+
+        VISIBILITY: str
+        VISIBILITY_ALL: str
+        VISIBILITY_PUBLIC: str
+        VISIBILITY_UNLISTED: str
+        VISIBILITY_PRIVATE: str
+        ADVANCED_SEARCH: str
+        MIN_RATING: str
+        MAX_RATING: str
+        TITLE_CONTAINS: str
+        DESCRIPTION_CONTAINS: str
+        ARTISTS_CONTAINS: str
+        AUTHOR_CONTAINS: str
+        ONLY_LEVELS_I_LIKED: str
+        MIN_LIKES: str
+        MAX_LIKES: str
+        STAFF_PICK_DESC: str
+        STAFF_PICK_CONFIG_DESC: str
+        STAFF_PICK_OFF: str
+        STAFF_PICK_TRUE: str
+        STAFF_PICK_FALSE: str
+        ONLY_LEVELS_I_COMMENTED_ON: str
+        COMMENTS: str
+        MIN_COMMENTS: str
+        MAX_COMMENTS: str
+        TAGS_COMMA_SEPARATED: str
+        ENTER_TEXT: str
+        ENTER_TAGS: str
+        SORT_BY: str
+        SORT_BY_DESCRIPTION: str
+        DATE_CREATED: str
+        DATE_PUBLISHED: str
+        RATING: str
+        LIKES: str
+        DECAYING_LIKES: str
+        TITLE_A_Z: str
+        SORT_ORDER: str
+        DESCENDING: str
+        ASCENDING: str
 
         def FILTERS(self, page: int, max_page: int) -> str:
-            return self._get("FILTERS").format(
+            return self._formats["FILTERS"](
                 page=f"{page:,}", pageCount=f"{max_page:,}"
             )
 
-        @property
-        def VISIBILITY(self) -> str:
-            return self._get("VISIBILITY")
-
-        @property
-        def VISIBILITY_ALL(self) -> str:
-            return self._get("VISIBILITY_ALL")
-
-        @property
-        def VISIBILITY_PUBLIC(self) -> str:
-            return self._get("VISIBILITY_PUBLIC")
-
-        @property
-        def VISIBILITY_UNLISTED(self) -> str:
-            return self._get("VISIBILITY_UNLISTED")
-
-        @property
-        def VISIBILITY_PRIVATE(self) -> str:
-            return self._get("VISIBILITY_PRIVATE")
-
-        @property
-        def ADVANCED_SEARCH(self) -> str:
-            return self._get("ADVANCED_SEARCH")
-
-        @property
-        def MIN_RATING(self) -> str:
-            return self._get("MIN_RATING")
-
-        @property
-        def MAX_RATING(self) -> str:
-            return self._get("MAX_RATING")
-
-        @property
-        def TITLE_CONTAINS(self) -> str:
-            return self._get("TITLE_CONTAINS")
-
-        @property
-        def DESCRIPTION_CONTAINS(self) -> str:
-            return self._get("DESCRIPTION_CONTAINS")
-
-        @property
-        def ARTISTS_CONTAINS(self) -> str:
-            return self._get("ARTISTS_CONTAINS")
-
-        @property
-        def AUTHOR_CONTAINS(self) -> str:
-            return self._get("AUTHOR_CONTAINS")
-
-        @property
-        def ONLY_LEVELS_I_LIKED(self) -> str:
-            return self._get("ONLY_LEVELS_I_LIKED")
-
-        @property
-        def MIN_LIKES(self) -> str:
-            return self._get("MIN_LIKES")
-
-        @property
-        def MAX_LIKES(self) -> str:
-            return self._get("MAX_LIKES")
-
-        @property
-        def STAFF_PICK_DESC(self) -> str:
-            return self._get("STAFF_PICK_SEARCH_DESC")
-
-        @property
-        def STAFF_PICK_CONFIG_DESC(self) -> str:
-            return self._get("STAFF_PICK_CONFIG_DESC")
-
-        @property
-        def STAFF_PICK_OFF(self) -> str:
-            return self._get("STAFF_PICK_OFF")
-
-        @property
-        def STAFF_PICK_TRUE(self) -> str:
-            return self._get("STAFF_PICK_TRUE")
-
-        @property
-        def STAFF_PICK_FALSE(self) -> str:
-            return self._get("STAFF_PICK_FALSE")
-
-        @property
-        def ONLY_LEVELS_I_COMMENTED_ON(self) -> str:
-            return self._get("ONLY_LEVELS_I_COMMENTED_ON")
-
-        @property
-        def COMMENTS(self) -> str:
-            return self._get("COMMENTS")
-
-        @property
-        def MIN_COMMENTS(self) -> str:
-            return self._get("MIN_COMMENTS")
-
-        @property
-        def MAX_COMMENTS(self) -> str:
-            return self._get("MAX_COMMENTS")
-
-        @property
-        def TAGS_COMMA_SEPARATED(self) -> str:
-            return self._get("TAGS_COMMA_SEPARATED")
-
-        @property
-        def ENTER_TEXT(self) -> str:
-            return self._get("ENTER_TEXT")
-
-        @property
-        def ENTER_TAGS(self) -> str:
-            return self._get("ENTER_TAGS")
-
-        @property
-        def SORT_BY(self) -> str:
-            return self._get("SORT_BY")
-
-        @property
-        def SORT_BY_DESCRIPTION(self) -> str:
-            return self._get("SORT_BY_DESCRIPTION")
-
-        @property
-        def DATE_CREATED(self) -> str:
-            return self._get("DATE_CREATED")
-
-        @property
-        def DATE_PUBLISHED(self) -> str:
-            return self._get("DATE_PUBLISHED")
-
-        @property
-        def RATING(self) -> str:
-            return self._get("RATING")
-
-        @property
-        def LIKES(self) -> str:
-            return self._get("LIKES")
-
-        @property
-        def DECAYING_LIKES(self) -> str:
-            return self._get("DECAYING_LIKES")
-
-        @property
-        def TITLE_A_Z(self) -> str:
-            return self._get("TITLE_A_Z")
-
-        @property
-        def SORT_ORDER(self) -> str:
-            return self._get("SORT_ORDER")
-
-        @property
-        def DESCENDING(self) -> str:
-            return self._get("DESCENDING")
-
-        @property
-        def ASCENDING(self) -> str:
-            return self._get("ASCENDING")
-
-    class Notification:
-        class Templates:
-            def __init__(self, parent: "Loc"):
-                self._parent = parent
-
-            def _get(self, key: str) -> str:
-                try:
-                    return self._parent._data["notification"]["templates"][key]
-                except KeyError:
-                    return self._parent._default["notification"]["templates"][key]
+    class Notification(_Section):
+        PREFIX = "notification."
+
+        READ_STATUS: str
+        UNREAD_STATUS: str
+        NOTIFICATION: str
+        NOTIFICATION_DESC_UNREAD: str
+        NOTIFICATION_DESC: str
+        UNREAD: str
+        none: str
+        none_past: str
+
+        class Templates(_Section):
+            PREFIX = "notification.templates."
+            FORMATS = (
+                "CHART_VISIBILITY_CHANGED",
+                "COMMENT_DELETED",
+                "CHART_DELETED",
+            )
 
             def CHART_VISIBILITY_CHANGED(
                 self, chart_name: str, visibility_status: str
             ) -> str:
-                return self._get("CHART_VISIBILITY_CHANGED").format(
+                return self._formats["CHART_VISIBILITY_CHANGED"](
                     chart_name=chart_name, visibility_status=visibility_status
                 )
 
             def COMMENT_DELETED(self, comment_content: str) -> str:
-                return self._get("COMMENT_DELETED").format(
+                return self._formats["COMMENT_DELETED"](
                     comment_content=comment_content
                 )
 
             def CHART_DELETED(self, chart_name: str) -> str:
-                return self._get("CHART_DELETED").format(chart_name=chart_name)
-
-        def __init__(self, parent: "Loc"):
-            self._parent = parent
-            self.templates = self.Templates(parent)
-
-        def _get(self, key: str) -> str:
-            try:
-                return self._parent._data["notification"][key]
-            except KeyError:
-                return self._parent._default["notification"][key]
-
-        @property
-        def READ_STATUS(self) -> str:
-            return self._get("READ_STATUS")
-
-        @property
-        def UNREAD_STATUS(self) -> str:
-            return self._get("UNREAD_STATUS")
-
-        @property
-        def NOTIFICATION(self) -> str:
-            return self._get("NOTIFICATION")
-
-        @property
-        def NOTIFICATION_DESC_UNREAD(self) -> str:
-            return self._get("NOTIFICATION_DESC_UNREAD")
-
-        @property
-        def NOTIFICATION_DESC(self) -> str:
-            return self._get("NOTIFICATION_DESC")
-
-        @property
-        def UNREAD(self) -> str:
-            return self._get("UNREAD")
-
-        @property
-        def none(self) -> str:
-            return self._get("none")
-
-        @property
-        def none_past(self) -> str:
-            return self._get("none_past")
-
-    def __init__(self, data: dict, default: dict):
-        self._data = data
-        self._default = default
-        self.search = self.Search(self)
-        self.playlist = self.Playlist(self)
-        self.background = self.Background(self)
-        self.notification = self.Notification(self)
-
-    def _get(self, value: str) -> str:
-        try:
-            return self._data[value]
-        except KeyError:
-            return self._default[value]
+                return self._formats["CHART_DELETED"](chart_name=chart_name)
+
+        def __init__(self, table: Mapping[str, Any]):
+            super().__init__(table)
+            self.templates = self.Templates(table)
+
+    def __init__(self, table: Mapping[str, Any]):
+        super().__init__(table)
+        self.mod_powers = "\n".join(f"- {line}" for line in self.mod_powers)
+        self.admin_powers = "\n".join(f"- {line}" for line in self.admin_powers)
+        self.search = self.Search(table)
+        self.playlist = self.Playlist(table)
+        self.background = self.Background(table)
+        self.notification = self.Notification(table)
+
+    def strings(self) -> list[str]:
+        """
+        Every message string of this locale (with fallbacks), once each.
+        """
+        strings = []
+        for value in self._table.values():
+            if isinstance(value, list):
+                strings.extend(value)
+            else:
+                strings.append(value)
+        return list(dict.fromkeys(strings))
 
     def invalid_page_plural(self, page: int, max_page: int) -> str:
-        return self._get("invalid_page_plural").format(
+        return self._formats["invalid_page_plural"](
             page=f"{page:,}", max_page=f"{max_page:,}"
         )
 
     def invalid_page_singular(self, page: int, max_page: int) -> str:
-        return self._get("invalid_page_singular").format(
+        return self._formats["invalid_page_singular"](
             page=f"{page:,}", max_page=f"{max_page:,}"
         )
 
-    @property
-    def not_mod(self) -> str:
-        return self._get("not_mod")
-
-    @property
-    def not_mod_or_owner(self) -> str:
-        return self._get("not_mod_or_owner")
-
-    @property
-    def is_mod(self) -> str:
-        return self._get("is_mod")
-
-    @property
-    def not_admin(self) -> str:
-        return self._get("not_admin")
-
-    @property
-    def is_admin(self) -> str:
-        return self._get("is_admin")
-
-    @property
-    def not_admin_or_owner(self) -> str:
-        return self._get("not_admin_or_owner")
-
-    @property
-    def staff_pick(self) -> str:
-        return self._get("staff_pick")
-
-    @property
-    def off(self) -> str:
-        return self._get("off")
-
-    @property
-    def on(self) -> str:
-        return self._get("on")
-
     def notifications_singular(self, num: int) -> str:
-        return self._get("notifications_singular").format(num=f"{num:,}")
+        return self._formats["notifications_singular"](num=f"{num:,}")
 
     def notifications_plural(self, num: int) -> str:
-        return self._get("notifications_plural").format(num=f"{num:,}")
-
-    @property
-    def find_in_playlists(self) -> str:
-        return self._get("find_in_playlists")
-
-    @property
-    def staff_pick_desc(self) -> str:
-        return self._get("staff_pick_desc")
-
-    @property
-    def non_staff_pick_desc(self) -> str:
-        return self._get("non_staff_pick_desc")
-
-    @property
-    def staff_pick_notice(self) -> str:
-        return self._get("staff_pick_notice")
-
-    @property
-    def staff_pick_confirm(self) -> str:
-        return self._get("staff_pick_confirm")
-
-    @property
-    def staff_pick_add(self) -> str:
-        return self._get("staff_pick_add")
-
-    @property
-    def staff_pick_remove(self) -> str:
-        return self._get("staff_pick_remove")
-
-    @property
-    def random_staff_pick(self) -> str:
-        return self._get("random_staff_pick")
-
-    @property
-    def random_non_staff_pick(self) -> str:
-        return self._get("random_non_staff_pick")
-
-    @property
-    def mod_powers(self) -> str:
-        lines = self._get("mod_powers")
-        return "\n".join(f"- {line}" for line in lines)
-
-    @property
-    def admin_powers(self) -> str:
-        lines = self._get("admin_powers")
-        return "\n".join(f"- {line}" for line in lines)
-
-    @property
-    def server_description(self) -> str:
-        return self._get("server_description")
+        return self._formats["notifications_plural"](num=f"{num:,}")
 
     def welcome(self, username: str) -> str:
-        return self._get("welcome").format(username=username)
+        return self._formats["welcome"](username=username)
 
     def item_not_found(self, item: str, name: str) -> str:
-        return self._get("item_not_found").format(item=item, name=name)
+        return self._formats["item_not_found"](item=item, name=name)
 
     def item_type_not_found(self, item: str) -> str:
-        return self._get("item_type_not_found").format(item=item)
+        return self._formats["item_type_not_found"](item=item)
 
     def items_not_found(self, item: str) -> str:
-        return self._get("items_not_found").format(item=item)
+        return self._formats["items_not_found"](item=item)
 
     def items_not_found_search(self, item: str) -> str:
-        return self._get("items_not_found_search").format(item=item)
-
-    @property
-    def not_logged_in(self) -> str:
-        return self._get("not_logged_in")
-
-    @property
-    def not_found(self) -> str:
-        return self._get("not_found")
-
-    @property
-    def unknown_error(self) -> str:
-        return self._get("unknown_error")
-
-    @property
-    def you(self) -> str:
-        return self._get("you")
-
-    @property
-    def default_particle(self) -> str:
-        return self._get("default_particle")
-
-    @property
-    def default_particle_desc(self) -> str:
-        return self._get("default_particle_desc")
-
-    @property
-    def default_engine(self) -> str:
-        return self._get("default_engine")
-
-    @property
-    def default_engine_desc(self) -> str:
-        return self._get("default_engine_desc")
-
-    @property
-    def default_skin(self) -> str:
-        return self._get("default_skin")
-
-    @property
-    def default_skin_desc(self) -> str:
-        return self._get("default_skin_desc")
-
-    @property
-    def uwu(self) -> str:
-        return self._get("uwu")
-
-    @property
-    def uwu_desc(self) -> str:
-        return self._get("uwu_desc")
-
-    @property
-    def slightly(self) -> str:
-        return self._get("slightly")
-
-    @property
-    def a_lot(self) -> str:
-        return self._get("a_lot")
-
-    @property
-    def extreme(self) -> str:
-        return self._get("extreme")
-
-    @property
-    def invalid_constant(self) -> str:
-        return self._get("invalid_constant")
-
-    @property
-    def rerate(self) -> str:
-        return self._get("rerate")
-
-    @property
-    def rerate_desc(self) -> str:
-        return self._get("rerate_desc")
+        return self._formats["items_not_found_search"](item=item)
 
     def time_ago(self, time_str: str) -> str:
-        return self._get("time_ago").format(time_ago=time_str)
+        return self._formats["time_ago"](time_ago=time_str)
 
     def time_ago_not_published(self, time_str: str) -> str:
-        return self._get("time_ago_not_published").format(time_ago=time_str)
+        return self._formats["time_ago_not_published"](time_ago=time_str)
 
     def use_website_to_upload(self, website: str) -> str:
-        return self._get("use_website_to_upload").format(url=website)
+        return self._formats["use_website_to_upload"](url=website)
+
+
+SUPPORTED_LOCALES = (
+    "el",
+    "en",
+    "es",
+    "fr",
+    "id",
+    "it",
+    "ja",
+    "ko",
+    "ru",
+    "tr",
+    "pt",
+    "zh-cn",
+    "zh-TW",
+    "vi",
+    "tl",
+)
 
 
 class LocaleManager:
+    """
+    Loads every supported locale at startup into a flat, read-only table
+    merged over the English one, so lookups never fall back at request
+    time. Keys a locale doesn't translate, or translates with different
+    format placeholders, are reported once, here.
+    """
+
     def __init__(self, default_locale: str):
         self.default_locale = default_locale
         self.locales: Dict[str, Loc] = {}
+        # locale -> keys served from the English fallback
+        self.missing: Dict[str, Tuple[str, ...]] = {}
+
+        default = self._read("en")
+        self._default_locale = Loc(MappingProxyType(default))
+        self.locales["en"] = self._default_locale
+        for locale in SUPPORTED_LOCALES:
+            if locale == "en":
+                continue
+            flat = self._read(locale)
+            if flat is None:
+                print(f"[WARN] Locale '{locale}' has no file, using en")
+                continue
+            missing = tuple(key for key in default if key not in flat)
+            if missing:
+                self.missing[locale] = missing
+                print(
+                    f"[WARN] Locale '{locale}' is missing {len(missing)} key(s), "
+                    f"using en: {', '.join(missing)}"
+                )
+            # a translated placeholder would raise KeyError in .format()
+            mismatched = [
+                key
+                for key, message in flat.items()
+                if key in default and placeholders(message) != placeholders(default[key])
+            ]
+            for key in mismatched:
+                print(
+                    f"[WARN] Locale '{locale}' message {key} has placeholders "
+                    f"{sorted(placeholders(flat[key]))}, expected "
+                    f"{sorted(placeholders(default[key]))}, using en"
+                )
+                del flat[key]
+            self.locales[locale] = Loc(MappingProxyType({**default, **flat}))
 
-        self._default_locale = None
-        self._default_locale = self.load_locale("en", overwrite_default={})
+    def _read(self, locale: str) -> Dict[str, Any] | None:
+        try:
+            with open(f"locales/locales/{locale}.json", "r", encoding="utf8") as f:
+                return flatten(json.load(f))
+        except FileNotFoundError:
+            return None
 
-    def load_locale(self, locale: str, overwrite_default: dict = None) -> Loc:
+    def load_locale(self, locale: str) -> Loc:
         if locale == "zhs":
             locale = "zh-cn"
         elif locale == "zht":
             locale = "zh-TW"
-        if locale in self.locales:
-            return self.locales[locale]
-        try:
-            with open(f"locales/locales/{locale}.json", "r", encoding="utf8") as f:
-                d = json.load(f)
-            locale_class = Loc(
-                d,
-                (
-                    overwrite_default
-                    if overwrite_default != None
-                    else self._default_locale._data
-                ),
-            )
-            self.locales[locale] = locale_class
-            return locale_class
-        except FileNotFoundError:
-            return self._default_locale
+        return self.locales.get(locale, self._default_locale)
 
     def assert_supported(self, locale: str):
-        supported = [
-            "el",
-            "en",
-            "es",
-            "fr",
-            "id",
-            "it",
-            "ja",
-            "ko",
-            "ru",
-            "tr",
-            "pt",
-            "zh-cn",
-            "zh-TW",
-            "vi",
-            "tl",
-        ]
-        if locale not in supported:
+        if locale not in SUPPORTED_LOCALES:
             raise AssertionError(f"Locale '{locale}' is not supported.")
 
     def get_messages(self, locale: str) -> Tuple[Loc, str]:
@@ -0,0 +1,122 @@
+"""
+Level conversion micro-benchmark
+
+Compares converting a backend page one chart per executor task
+(api_level_to_level, the old route code) with one task per page
+(api_levels_to_levels). Run from the repository root:
+
+    python -m scripts.bench_level_conversion --pages 500 --page-size 10
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from helpers.api_helpers import api_level_to_level, api_levels_to_levels
+from helpers.data_compilers import compile_engines_list
+from helpers.models.api.levels import Chart
+from locales.locale import Locale
+
+BASE_URL = "http://localhost"
+ASSET_BASE_URL = "http://localhost/assets"
+
+
+def make_request(uwu: str) -> SimpleNamespace:
+    loc, localization = Locale.get_messages("en")
+    engine, _ = compile_engines_list(BASE_URL, localization)[0]
+    return SimpleNamespace(
+        app=SimpleNamespace(base_url=BASE_URL),
+        state=SimpleNamespace(
+            loc=loc,
+            localization=localization,
+            uwu=uwu,
+            skin="engine_default",
+            particle="engine_default",
+            engine=engine.name,
+        ),
+    )
+
+
+def make_charts(count: int) -> list[Chart]:
+    now = datetime.now(timezone.utc)
+    return [
+        Chart(
+            id=f"{n:032x}",
+            rating=n % 40,
+            author="0" * 16,
+            author_full="author#0000",
+            title=f"level {n}",
+            artists="artist",
+            staff_pick=n % 3 == 0,
+            jacket_file_hash="a" * 40,
+            music_file_hash="b" * 40,
+            chart_file_hash="c" * 40,
+            background_v1_file_hash="d" * 40,
+            background_v3_file_hash="e" * 40,
+            tags=["tag one", "tag two"],
+            status="PUBLIC",
+            like_count=n,
+            comment_count=n // 2,
+            created_at=now - timedelta(hours=n),
+            published_at=now - timedelta(minutes=n),
+            updated_at=now,
+            chart_design="design",
+        )
+        for n in range(count)
+    ]
+
+
+async def run_blocking(executor, func, *args, **kwargs):
+    # same as SonolusFastAPI.run_blocking
+    return await asyncio.get_event_loop().run_in_executor(
+        executor, lambda: func(*args, **kwargs)
+    )
+
+
+async def per_chart(executor, request, charts):
+    return await asyncio.gather(
+        *[
+            run_blocking(
+                executor, api_level_to_level, request, ASSET_BASE_URL, chart, "default_or_v3"
+            )
+            for chart in charts
+        ]
+    )
+
+
+async def per_page(executor, request, charts):
+    return await run_blocking(
+        executor, api_levels_to_levels, request, ASSET_BASE_URL, charts, "default_or_v3"
+    )
+
+
+async def bench(name, func, executor, request, charts, pages: int):
+    await func(executor, request, charts)  # warm up catalogs and resolver
+    start = time.perf_counter()
+    for _ in range(pages):
+        await func(executor, request, charts)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>10}: {elapsed / pages * 1e6:8.1f} us/page")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--uwu", default="off", choices=["off", "uwu", "owo", "uvu"])
+    args = parser.parse_args()
+
+    executor = ThreadPoolExecutor(max_workers=16)
+    request = make_request(args.uwu)
+    charts = make_charts(args.page_size)
+    print(f"{args.pages} pages of {args.page_size} charts, uwu={args.uwu}")
+    await bench("per chart", per_chart, executor, request, charts, args.pages)
+    await bench("per page", per_page, executor, request, charts, args.pages)
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
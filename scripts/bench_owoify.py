@@ -0,0 +1,58 @@
+"""
+owoify benchmark
+
+Times the compiled owoify engine against the Word pipeline it replaces
+(owoify_reference) on chart titles, descriptions and a comment thread,
+without the handle_uwu cache. Run from the repository root:
+
+    python -m scripts.bench_owoify --repeat 20
+"""
+
+import argparse
+import time
+
+from helpers.owoify import owoify, owoify_reference
+from scripts.owoify_golden import corpus_items
+
+COMMENT_THREAD = "\n".join(
+    f"Comment {n}: I really love this chart, the ending was great! "
+    f"Over and over again, though the hold notes feel off (timing?). "
+    f"See https://example.com/levels/{n} for my replay."
+    for n in range(50)
+)
+
+
+def time_per_call(func, texts: list[str], level: int, locale: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text, level, locale, True)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = [text for text, locales in corpus_items() if "en" in locales]
+    workloads = {
+        "titles": [text for text in corpus if len(text) <= 40],
+        "descriptions": [text for text in corpus if len(text) > 40],
+        "comment thread": [COMMENT_THREAD],
+    }
+    print(f"{'workload':>15} {'level':>6} {'reference':>12} {'engine':>12} {'speedup':>8}")
+    for level in (0, 1, 2):
+        owoify("", level, "en", True)  # compile the engines first
+    for name, texts in workloads.items():
+        for level in (0, 1, 2):
+            reference = time_per_call(owoify_reference, texts, level, "en", args.repeat)
+            engine = time_per_call(owoify, texts, level, "en", args.repeat)
+            print(
+                f"{name:>15} {level:>6} {reference * 1e6:>10.1f}us"
+                f" {engine * 1e6:>10.1f}us {reference / engine:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
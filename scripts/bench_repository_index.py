@@ -0,0 +1,83 @@
+"""
+Repository path index benchmark
+
+Adds a few thousand synthetic asset files to a Repository, the way the
+catalog compilers do at startup, then adds them all again (the update path).
+The same run with the old full-scan path lookup is shown for comparison.
+Run from the repository root:
+
+    python -m scripts.bench_repository_index --sizes 1000 2000 4000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from helpers.repository_map import Repository
+
+
+class ScanRepository(Repository):
+    """
+    The old lookup: copy the map and compare every stored path.
+    """
+
+    def get_hash_from_file_path(self, file: os.PathLike):
+        input_path = os.path.abspath(file)
+        for sha1, data in self._map.copy().items():
+            if type(data["file"]) != str:
+                continue
+            if input_path == os.path.abspath(data["file"]):
+                return sha1
+        return None
+
+    def add_file(self, file: os.PathLike, error_on_file_nonexistent: bool = True):
+        self.get_hash_from_file_path(file)
+        return super().add_file(file, error_on_file_nonexistent)
+
+
+def make_assets(directory: str, count: int) -> list[str]:
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"asset_{n}")
+        with open(path, "wb") as f:
+            f.write(n.to_bytes(4, "little") * 64)
+        paths.append(path)
+    return paths
+
+
+def run(repository: Repository, paths: list[str], threads: int) -> tuple[float, float]:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(repository.add_file, paths))
+        added = time.perf_counter() - start
+
+        start = time.perf_counter()
+        list(executor.map(repository.add_file, paths))
+        updated = time.perf_counter() - start
+    return added, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'assets':>8} {'repo':>6} {'add':>10} {'re-add':>10} {'us/file':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_assets(directory, max(args.sizes))
+        for size in args.sizes:
+            for name, cls in (("index", Repository), ("scan", ScanRepository)):
+                repository = cls()
+                added, updated = run(repository, paths[:size], args.threads)
+                assert len(repository._map) == size
+                print(
+                    f"{size:>8} {name:>6} {added:>9.3f}s {updated:>9.3f}s"
+                    f" {(added + updated) / (2 * size) * 1e6:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
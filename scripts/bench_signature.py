@@ -0,0 +1,126 @@
+"""
+Sonolus-Signature verification benchmark
+
+Verifies a burst of signed login bodies (a throwaway P-256 key, the Sonolus
+private key isn't public) the old way, on the event loop with a plain
+VerifyingKey, and through SignatureVerifier with a precomputed key on a
+thread or process pool. Reports signatures per second and the longest the
+event loop was blocked. Run from the repository root:
+
+    python -m scripts.bench_signature --count 500 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import time
+
+from ecdsa import SigningKey, VerifyingKey, NIST256p
+from ecdsa.util import sigencode_string, number_to_string
+
+from helpers.signature import SignatureVerifier, verify_signature
+
+
+def make_key() -> tuple[SigningKey, dict]:
+    signing_key = SigningKey.generate(curve=NIST256p)
+    point = signing_key.get_verifying_key().pubkey.point
+    order = NIST256p.order
+    jwk = {
+        "kty": "EC",
+        "x": base64.urlsafe_b64encode(number_to_string(point.x(), order)).decode().rstrip("="),
+        "y": base64.urlsafe_b64encode(number_to_string(point.y(), order)).decode().rstrip("="),
+        "crv": "P-256",
+    }
+    return signing_key, jwk
+
+
+def make_logins(signing_key: SigningKey, count: int) -> list[tuple[str, bytes]]:
+    logins = []
+    for n in range(count):
+        body = json.dumps(
+            {
+                "type": "authenticateServer",
+                "address": "https://untitledcharts.com",
+                "time": 1700000000000 + n,
+                "userProfile": {"id": f"{n:032x}", "handle": str(n), "name": f"user {n}"},
+            }
+        ).encode()
+        signature = signing_key.sign(
+            body, hashfunc=hashlib.sha256, sigencode=sigencode_string
+        )
+        logins.append((base64.urlsafe_b64encode(signature).decode(), body))
+    return logins
+
+
+async def storm(verify, logins: list[tuple[str, bytes]]) -> tuple[float, float]:
+    """
+    Verify every login concurrently while a ticker measures how late the
+    event loop runs it. Returns (seconds, longest stall in seconds).
+    """
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - before - 0.001)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify(signature, body) for signature, body in logins))
+    elapsed = time.perf_counter() - start
+    done = True
+    await ticking
+    assert all(results), "a valid signature failed to verify"
+    return elapsed, stall
+
+
+def report(name: str, count: int, elapsed: float, stall: float):
+    print(f"{name:>28} {count / elapsed:>10.0f}/s {stall * 1000:>10.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    signing_key, jwk = make_key()
+    logins = make_logins(signing_key, args.count)
+    print(f"{'':>28} {'signatures':>12} {'loop stall':>12}")
+
+    # the old route code: key built lazily, no precomputation, on the loop
+    plain_key = VerifyingKey.from_public_point(
+        signing_key.get_verifying_key().pubkey.point, curve=NIST256p
+    )
+
+    async def on_loop(signature, body):
+        return verify_signature(plain_key, signature, body)
+
+    report("event loop, plain key", args.count, *await storm(on_loop, logins))
+
+    start = time.perf_counter()
+    verifier = SignatureVerifier(jwk, workers=0)
+    print(f"(key precomputed in {(time.perf_counter() - start) * 1000:.0f}ms)")
+    report("thread, precomputed key", args.count, *await storm(verifier.verify, logins))
+
+    for workers in args.workers:
+        verifier = SignatureVerifier(jwk, workers=workers)
+        verifier.start()
+        try:
+            report(
+                f"{workers} process(es), precomputed",
+                args.count,
+                *await storm(verifier.verify, logins),
+            )
+        finally:
+            verifier.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
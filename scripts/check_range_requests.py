@@ -0,0 +1,107 @@
+"""
+Range request check
+
+Checks parse_range and the zip member route of /sonolus/repository on
+suffix, reversed and empty-file ranges. Run from the repository root:
+
+    python -m scripts.check_range_requests
+"""
+
+import asyncio
+import os
+import tempfile
+import zipfile
+from types import SimpleNamespace
+
+from helpers.repository_map import repo
+from sonolus.repository.index import main as repository_route, parse_range
+
+UNSATISFIABLE = "416"
+
+# (range header, file size, expected offsets, None or UNSATISFIABLE)
+PARSE_CASES = [
+    ("bytes=0-4", 10, (0, 4)),
+    ("bytes=5-", 10, (5, 9)),
+    ("bytes=-3", 10, (7, 9)),
+    ("bytes=-30", 10, (0, 9)),
+    ("bytes=8-20", 10, (8, 9)),
+    ("bytes=-0", 10, UNSATISFIABLE),
+    ("bytes=5-2", 10, UNSATISFIABLE),
+    ("bytes=10-", 10, UNSATISFIABLE),
+    ("bytes=-5", 0, UNSATISFIABLE),
+    ("bytes=0-", 0, UNSATISFIABLE),
+    ("bytes=0-1,3-4", 10, None),
+    ("items=0-1", 10, None),
+    ("bytes=a-b", 10, None),
+    ("bytes=-", 10, None),
+]
+
+# (zip member size, range header, expected status, expected Content-Range)
+ROUTE_CASES = [
+    (0, "bytes=-5", 416, "bytes */0"),
+    (0, "bytes=-0", 416, "bytes */0"),
+    (0, None, 200, None),
+    (10, "bytes=-0", 416, "bytes */10"),
+    (10, "bytes=5-2", 416, "bytes */10"),
+    (10, "bytes=-4", 206, "bytes 6-9/10"),
+]
+
+
+def parse(range_header: str, size: int):
+    try:
+        return parse_range(range_header, size)
+    except ValueError:
+        return UNSATISFIABLE
+
+
+async def request(hash: str, range_header: str | None):
+    async def run_blocking(func, *args):
+        return func(*args)
+
+    headers = {"range": range_header} if range_header else {}
+    return await repository_route(
+        SimpleNamespace(app=SimpleNamespace(run_blocking=run_blocking), headers=headers),
+        hash,
+    )
+
+
+async def check_route(directory: str) -> int:
+    failed = 0
+    archive = os.path.join(directory, "assets.zip")
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("empty", b"")
+        zip_file.writestr("ten", b"0123456789")
+    hashes = {
+        0: repo.add_file(f"{archive}|empty"),
+        10: repo.add_file(f"{archive}|ten"),
+    }
+    for size, range_header, expected_status, expected_range in ROUTE_CASES:
+        response = await request(hashes[size], range_header)
+        close = getattr(response, "background", None)
+        if close is not None:
+            await close()
+        content_range = response.headers.get("content-range")
+        ok = response.status_code == expected_status and content_range == expected_range
+        print(
+            f"{'OK' if ok else 'FAIL'} {size}-byte member, {range_header}: "
+            f"{response.status_code} {content_range}"
+        )
+        failed += not ok
+    return failed
+
+
+def check() -> int:
+    failed = 0
+    for range_header, size, expected in PARSE_CASES:
+        actual = parse(range_header, size)
+        ok = actual == expected
+        print(f"{'OK' if ok else 'FAIL'} parse_range({range_header!r}, {size}) = {actual}")
+        failed += not ok
+    with tempfile.TemporaryDirectory() as directory:
+        failed += asyncio.run(check_route(directory))
+    print(f"{failed} failure(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(check())
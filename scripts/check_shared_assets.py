@@ -0,0 +1,71 @@
+"""
+Shared asset check
+
+Identical files (a skin and its -EN copy, engine ROMs...) share one hash
+in the Repository. Checks that editing or deleting one copy, the way the
+files/ watcher does (add_file / forget_path), keeps the other servable.
+Run from the repository root:
+
+    python -m scripts.check_shared_assets
+"""
+
+import os
+import tempfile
+
+from helpers.repository_map import Repository
+
+
+def write(path: str, data: bytes, mtime: int):
+    with open(path, "wb") as f:
+        f.write(data)
+    # the hash manifest keys on size and mtime
+    os.utime(path, (mtime, mtime))
+
+
+def setup(directory: str) -> tuple[Repository, str, str, str]:
+    first = os.path.join(directory, "PR-S1-3", "data")
+    second = os.path.join(directory, "PR-S1-3-EN", "data")
+    for path in (first, second):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(path, b"shared skin data", 1)
+    repository = Repository()
+    sha1 = repository.add_file(first)
+    repository.add_file(second)
+    return repository, first, second, sha1
+
+
+def servable(repository: Repository, path: str, sha1: str) -> bool:
+    return (
+        repository.get_hash_from_file_path(path) == sha1
+        and repository.has_hash(sha1)
+        and repository.get_file(sha1) == b"shared skin data"
+    )
+
+
+def check() -> int:
+    failed = 0
+    # each case acts on one copy and expects the other to keep its hash
+    for case in ("edit first", "edit second", "delete first", "delete second"):
+        with tempfile.TemporaryDirectory() as directory:
+            repository, first, second, sha1 = setup(directory)
+            action, which = case.split()
+            changed, other = (first, second) if which == "first" else (second, first)
+            if action == "edit":
+                write(changed, b"edited skin data", 2)
+                repository.add_file(changed)
+            else:
+                os.remove(changed)
+                repository.forget_path(changed)
+            ok = servable(repository, other, sha1)
+            # with the last copy gone too, the hash goes away
+            os.remove(other)
+            repository.forget_path(other)
+            ok = ok and not repository.has_hash(sha1)
+            print(f"{'OK' if ok else 'FAIL'} {case}")
+            failed += not ok
+    print(f"{failed} failure(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(check())
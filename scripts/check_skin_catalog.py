@@ -0,0 +1,83 @@
+"""
+Skin catalog check
+
+A skin.json without an engine list means the skin works with every engine.
+Checks that SkinCatalog lists such skins for every engine (for_engine, the
+skins list) and also picks them for level resources (resolve), in catalog
+order and by locale. Run from the repository root:
+
+    python -m scripts.check_skin_catalog
+"""
+
+from types import SimpleNamespace
+
+from helpers.data_compilers import SkinCatalog
+
+# (name, engines, theme, locale), in catalog order
+SKINS = [
+    ("pjsekai-v3", ["pjsekai"], "v3", None),
+    ("pjsekai-v3-EN", ["pjsekai"], "v3", "en"),
+    ("any-v3", None, "v3", None),
+    ("any-v3-JA", None, "v3", "ja"),
+    ("next-v4", ["NextSEKAI"], "v4", None),
+    ("any-v4", None, "v4", None),
+]
+
+# (engine, skin names for_engine gives)
+FOR_ENGINE_CASES = [
+    ("pjsekai", ["pjsekai-v3", "pjsekai-v3-EN", "any-v3", "any-v3-JA", "any-v4"]),
+    ("NextSEKAI", ["any-v3", "any-v3-JA", "next-v4", "any-v4"]),
+    ("other", ["any-v3", "any-v3-JA", "any-v4"]),
+]
+
+# (theme, engine, locale, skin name resolve gives, or None for KeyError)
+RESOLVE_CASES = [
+    ("v3", "pjsekai", "en", "pjsekai-v3-EN"),
+    ("v3", "pjsekai", "ja", "any-v3-JA"),
+    ("v3", "pjsekai", "ko", "pjsekai-v3"),
+    ("v3", "other", "en", "any-v3"),
+    ("v3", "other", "ja", "any-v3-JA"),
+    ("v4", "NextSEKAI", "en", "next-v4"),
+    ("v4", "pjsekai", "en", "any-v4"),
+    ("v5", "pjsekai", "en", None),
+]
+
+
+def catalog() -> SkinCatalog:
+    # only the name of a skin is looked at
+    return SkinCatalog(
+        [
+            (SimpleNamespace(name=name), engines, theme, locale)
+            for name, engines, theme, locale in SKINS
+        ]
+    )
+
+
+def resolve(skins: SkinCatalog, theme: str, engine: str, locale: str) -> str | None:
+    try:
+        return skins.resolve(theme, engine, locale).name
+    except KeyError:
+        return None
+
+
+def check() -> int:
+    failed = 0
+    skins = catalog()
+    for engine, expected in FOR_ENGINE_CASES:
+        actual = [skin.name for skin in skins.for_engine(engine)]
+        ok = actual == expected
+        print(f"{'OK' if ok else 'FAIL'} for_engine({engine!r}) = {actual}")
+        failed += not ok
+    # twice, the second lookup comes from the index the first one built
+    for _ in range(2):
+        for theme, engine, locale, expected in RESOLVE_CASES:
+            actual = resolve(skins, theme, engine, locale)
+            ok = actual == expected
+            print(f"{'OK' if ok else 'FAIL'} resolve({theme!r}, {engine!r}, {locale!r}) = {actual}")
+            failed += not ok
+    print(f"{failed} failure(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(check())
@@ -0,0 +1,139 @@
+"""
+owoify golden outputs
+
+Checks that the compiled owoify engine gives exactly the outputs recorded
+in scripts/owoify_golden.json (made with the Word pipeline) for every
+corpus text, locale, level and symbols setting. Run from the repository
+root:
+
+    python -m scripts.owoify_golden            # check
+    python -m scripts.owoify_golden --update   # re-record with owoify_reference
+"""
+
+import argparse
+import json
+import os
+
+from helpers import owoify as owo
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "owoify_golden.json")
+LEVELS = (0, 1, 2)
+
+# chart titles, descriptions and comments, on top of the locale strings
+EXTRA_CORPUS = [
+    "",
+    " ",
+    "Hello World",
+    "  leading and trailing spaces  ",
+    "Tell Your World (Full ver.)",
+    "Melt [MASTER 32] - remake!",
+    "Rolling Girl <APPEND>",
+    "Over the time, you feel the meme... haha hehe hahaha",
+    "THE FINAL LEVEL; THOUGHT OF THE OLD ROLE!!",
+    "Dedicated to my friends, remember when we were frightened?",
+    "Aviation is great, worse than poi and fuc",
+    "NONE of the Mom mem Meme Mem me Me feel Feel",
+    "Really? I'd love to play it over and over again.",
+    "new chart https://example.com/charts/abc?x=1 and www.example.org too.",
+    "Line one.\nLine two, with a comma.\n\nLast line!",
+    "tabs\tand\tnewlines\r\nmixed",
+    "Numbers 1.5, 2,000 and 3.14159; done.",
+    "({<brackets>})",
+    "NYWO nywo Nywo nyo",
+    "Thanks for playing! Please leave a like :) (^w^)",
+    "Ölü değil; çok güzel bir seviye. Teşekkürler!",
+    "Sıra olmalı, ryo ll ly nr ple.",
+    "Eşsiz müzik (orijinal) - oynayın!",
+    "日本語のタイトル 【初音ミク】",
+    "ボカロ曲 / Vocaloid song, remastered.",
+    "Flower Flowers Flowering overflow overlord",
+    "fi FI Fi ver Ver VER Pple ple PLE vle wle",
+    "Dead read Read dead That that this those",
+    "OLD old Old ol OL Ol lo LO Lo ro RO",
+    "there's no place like home, no no no.",
+    "Super long description " * 20,
+]
+
+
+def corpus_items() -> list[tuple[str, tuple[str, ...]]]:
+    """
+    (text, locales to owoify it with)
+    """
+
+    def strings(value):
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from strings(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from strings(item)
+
+    items: dict[str, set[str]] = {}
+    for text in EXTRA_CORPUS:
+        items.setdefault(text, set()).update(("en", "tr"))
+    for locale in ("en", "tr"):
+        with open(f"locales/locales/{locale}.json", "r", encoding="utf8") as f:
+            for text in strings(json.load(f)):
+                items.setdefault(text, set()).add(locale)
+    return [(text, tuple(sorted(locales))) for text, locales in items.items()]
+
+
+def variants(locales: tuple[str, ...]):
+    for locale in locales:
+        for level in LEVELS:
+            for symbols in (True, False):
+                yield locale, level, symbols
+
+
+def key(locale: str, level: int, symbols: bool) -> str:
+    return f"{locale}/{level}/{int(symbols)}"
+
+
+def update():
+    golden = [
+        {
+            "text": text,
+            "outputs": {
+                key(*variant): owo.owoify_reference(text, variant[1], variant[0], variant[2])
+                for variant in variants(locales)
+            },
+        }
+        for text, locales in corpus_items()
+    ]
+    with open(GOLDEN_PATH, "w", encoding="utf8") as f:
+        json.dump(golden, f, ensure_ascii=False, indent=1)
+    print(f"Recorded {sum(len(entry['outputs']) for entry in golden)} outputs")
+
+
+def check() -> int:
+    with open(GOLDEN_PATH, "r", encoding="utf8") as f:
+        golden = json.load(f)
+    checked = failed = 0
+    for entry in golden:
+        for variant, expected in entry["outputs"].items():
+            locale, level, symbols = variant.split("/")
+            actual = owo.owoify(entry["text"], int(level), locale, symbols == "1")
+            checked += 1
+            if actual != expected:
+                failed += 1
+                print(f"MISMATCH {variant} {entry['text']!r}")
+                print(f"  expected {expected!r}")
+                print(f"  actual   {actual!r}")
+    print(f"Checked {checked} outputs, {failed} mismatch(es)")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+    if args.update:
+        update()
+        return 0
+    return check()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
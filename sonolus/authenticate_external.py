@@ -1,44 +1,13 @@
-import base64
-import hashlib
-
-import aiohttp
-from ecdsa import VerifyingKey, NIST256p, ellipticcurve
-from ecdsa.util import string_to_number, sigdecode_string
 from fastapi import APIRouter, Request, status, HTTPException
 
 from helpers.models.sonolus.account import ServerAuthenticateExternalRequest
+from helpers.backend_client import BackendError
 
 from datetime import timedelta
 import time
 
 router = APIRouter()
 
-# https://wiki.sonolus.com/custom-server-specs/headers/sonolus-signature
-JWK = {
-    "key_ops": ["verify"],
-    "ext": True,
-    "kty": "EC",
-    "x": "d2B14ZAn-zDsqY42rHofst8rw3XB90-a5lT80NFdXo0",
-    "y": "Hxzi9DHrlJ4CVSJVRnydxFWBZAgkFxZXbyxPSa8SJQw",
-    "crv": "P-256",
-}
-del JWK["ext"]
-del JWK["key_ops"]
-
-
-def load_public_key(jwk_dict):
-    x = base64.urlsafe_b64decode(jwk_dict["x"] + "==")
-    y = base64.urlsafe_b64decode(jwk_dict["y"] + "==")
-
-    x_int = string_to_number(x)
-    y_int = string_to_number(y)
-
-    curve = NIST256p
-    point = ellipticcurve.Point(curve.curve, x_int, y_int)
-
-    pub_key = VerifyingKey.from_public_point(point, curve=curve)
-    return pub_key
-
 
 @router.post("/")
 async def main(request: Request, data: ServerAuthenticateExternalRequest):
@@ -58,24 +27,9 @@ async def main(request: Request, data: ServerAuthenticateExternalRequest):
     signature = request.headers.get("Sonolus-Signature")
     if signature is None:
         raise HTTPException(status_code=400, detail="Missing Sonolus-Signature header")
-    public_key: VerifyingKey = (
-        request.app.sono_pub_key if hasattr(request.app, "sono_pub_key") else None
-    )
-    if not public_key:
-        request.app.sono_pub_key = load_public_key(JWK)
-        public_key = request.app.sono_pub_key
-
-    # Verify the signature
-    decoded_signature = base64.urlsafe_b64decode(signature)
+    # on the signature process pool, see SignatureVerifier
     body = await request.body()
-    try:
-        public_key.verify(
-            decoded_signature,
-            body,
-            hashfunc=hashlib.sha256,
-            sigdecode=sigdecode_string,
-        )
-    except Exception:
+    if not await request.app.signature_verifier.verify(signature, body):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature"
         )
@@ -101,17 +55,13 @@ async def main(request: Request, data: ServerAuthenticateExternalRequest):
             detail="Invalid time. Please click 'Cancel' and try again.",
         )
 
-    headers = {request.app.auth_header: request.app.auth}
     profilewithtypeandid = data.model_dump()["userProfile"]
     profilewithtypeandid["type"] = "external"
     profilewithtypeandid["id_key"] = id
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.post(
-            request.app.api_config["url"] + "/api/accounts/session/external/",
-            json=profilewithtypeandid,
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail="We're not sure what went wrong!"
-                )
+    try:
+        await request.app.backend.create_external_session(profilewithtypeandid)
+    except BackendError as e:
+        raise HTTPException(
+            status_code=e.status, detail="We're not sure what went wrong!"
+        )
     return {"message": "Success. Return to the browser."}
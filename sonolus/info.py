@@ -1,12 +1,10 @@
-import aiohttp
-
 from fastapi import APIRouter, Request, HTTPException, status
 
 from helpers.data_compilers import (
     compile_banner,
-    compile_particles_list,
-    compile_engines_list,
-    compile_skins_list,
+    particles_catalog,
+    engines_catalog,
+    skins_catalog,
 )
 from helpers.models.sonolus.misc import ServerInfoButton
 from helpers.data_helpers import (
@@ -87,29 +85,21 @@ async def main(request: Request):
         )
     )
     engines = await request.app.run_blocking(
-        compile_engines_list, request.app.base_url, request.state.localization
+        engines_catalog, request.app.base_url, request.state.localization
     )
     options.append(
         ServerFormOptionsFactory.server_select_option(
             query="defaultengine",
             name=locale.default_engine,
             required=False,
-            default=engines[0]["name"],
-            values=[{"name": item["name"], "title": item["title"]} for item in engines],
+            default=engines[0].name,
+            values=[{"name": item.name, "title": item.title} for item in engines],
             description=handle_uwu(
                 locale.default_engine_desc, request.state.localization, uwu_level
             ),
         )
     )
-    skins = await request.app.run_blocking(compile_skins_list, request.app.base_url)
-    unique = []
-    seen = set()
-
-    for item in skins:
-        theme = item["theme"]
-        if theme not in seen:
-            unique.append({"name": theme, "title": theme.upper()})
-            seen.add(theme)
+    skins = await request.app.run_blocking(skins_catalog, request.app.base_url)
     options.append(
         ServerFormOptionsFactory.server_select_option(
             query="defaultskin",
@@ -118,8 +108,8 @@ async def main(request: Request):
             default="engine_default",
             values=[{"name": "engine_default", "title": "#DEFAULT"}]
             + [
-                {"name": k, "title": k.upper()}
-                for k in {item["theme"]: None for item in skins}
+                {"name": theme, "title": theme.upper()}
+                for theme in skins.themes
             ],
             description=handle_uwu(
                 locale.default_skin_desc, request.state.localization, uwu_level
@@ -127,7 +117,7 @@ async def main(request: Request):
         )
     )
     particles = await request.app.run_blocking(
-        compile_particles_list, request.app.base_url
+        particles_catalog, request.app.base_url
     )
     options.append(
         ServerFormOptionsFactory.server_select_option(
@@ -137,9 +127,9 @@ async def main(request: Request):
             default="engine_default",
             values=[{"name": "engine_default", "title": "#DEFAULT"}]
             + [
-                {"name": item["name"], "title": item["title"]}
+                {"name": item.name, "title": item.title}
                 for item in particles
-                if item.get("engine_specific", False) == False # TODO uhh there is no engine_specific anymore
+                if not particles.engine_specific[item.name]
             ],
             description=handle_uwu(
                 locale.default_particle_desc, request.state.localization, uwu_level
@@ -170,13 +160,7 @@ async def main(request: Request):
     login_message = False
     if auth:
         try:
-            headers = {request.app.auth_header: request.app.auth}
-            headers["authorization"] = auth
-            async with aiohttp.ClientSession(headers=headers) as cs:
-                async with cs.get(
-                    request.app.api_config["url"] + f"/api/accounts/session/account/",
-                ) as req:
-                    response = await req.json()
+            response = await request.app.backend.account(auth)
             desc += "\n\n" + ("-" * 40) + "\n"
             desc += "\n" + locale.welcome(response["sonolus_username"])
             notifications = response["unread_notifications"]
@@ -1,15 +1,11 @@
-import asyncio
-
 from fastapi import APIRouter, Request, Query
 from fastapi import HTTPException, status
 
 from typing import Literal, Optional, List
 
-import aiohttp
-
 from helpers.paginate import list_to_pages
 from helpers.sonolus_typings import ItemType
-from helpers.api_helpers import api_level_to_level
+from helpers.api_helpers import api_levels_to_levels
 
 router = APIRouter()
 
@@ -107,21 +103,9 @@ async def main(
                 "sort_order": sort_order,
                 "meta_includes": keywords,
             }
-        headers = {request.app.auth_header: request.app.auth}
-        if auth:
-            headers["authorization"] = auth
-        async with aiohttp.ClientSession(headers=headers) as cs:
-            async with cs.get(
-                request.app.api_config["url"] + "/api/charts/",
-                params={
-                    k: (int(v) if isinstance(v, bool) else v)
-                    for k, v in params.items()
-                    if v is not None
-                },
-            ) as req:
-                response = await req.json()
-        pageCount = response["pageCount"]
-        if sort_by == "random" and pageCount != 0 and len(response["data"]) == 10:
+        response = await request.app.backend.list_charts(params, auth=auth)
+        pageCount = response.pageCount
+        if sort_by == "random" and pageCount != 0 and len(response.data) == 10:
             pageCount = (
                 page + 2
             )  # always have one extra page, random will not run out and there may be duplicates
@@ -139,19 +123,14 @@ async def main(
             raise HTTPException(
                 status_code=400, detail=locale.items_not_found_search(item_type)
             )
-        response_data = response["data"]
-        asset_base_url = response["asset_base_url"].removesuffix("/")
-        data = await asyncio.gather(
-            *[
-                request.app.run_blocking(
-                    api_level_to_level,
-                    request,
-                    asset_base_url,
-                    item,
-                    request.state.levelbg,
-                )
-                for item in response_data
-            ]
+        response_data = response.data
+        asset_base_url = response.asset_base_url.removesuffix("/")
+        data = await request.app.run_blocking(
+            api_levels_to_levels,
+            request,
+            asset_base_url,
+            response_data,
+            request.state.levelbg,
         )
         num_pages = pageCount
         generate_pages = False
@@ -185,7 +164,10 @@ async def main(
                 ),
             )
         page_data = data
-    page_data = handle_item_uwu(page_data, request.state.localization, uwu_level)
+    if uwu_level != "off":
+        page_data = await request.app.run_blocking(
+            handle_item_uwu, page_data, request.state.localization, uwu_level
+        )
     return {
         "pageCount": len(pages) if generate_pages else num_pages,
         "items": page_data,
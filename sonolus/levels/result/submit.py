@@ -4,7 +4,7 @@ from helpers.sonolus_typings import ItemType
 from pydantic import BaseModel
 from typing import Optional
 from helpers.models.sonolus.item import ReplayItem
-import aiohttp
+from helpers.backend_client import BackendError
 import json
 
 router = APIRouter()
@@ -32,22 +32,18 @@ async def main(request: Request, item_type: ItemType, data: ServerSubmitLevelRes
     
     auth = request.headers.get("Sonolus-Session")
 
-    async with aiohttp.ClientSession(headers=({"authorization": auth} if auth else None)) as session: # TODO: shared ClientSession
-        async with session.get(
-            request.app.api_config["url"]
-            + f"/api/accounts/generate_upload_token/",
-            params={"hashes": json.dumps({
-                "data": data.replay
-            })}
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.unknown_error
-                )
-
-            return ServerSubmitLevelResultResponse(
-                key=await req.text(),
-                hashes=[
-
-                ]
-            )
\ No newline at end of file
+    try:
+        key = await request.app.backend.generate_upload_token(
+            json.dumps({"data": data.replay}), auth
+        )
+    except BackendError as e:
+        raise HTTPException(
+            status_code=e.status, detail=locale.unknown_error
+        )
+
+    return ServerSubmitLevelResultResponse(
+        key=key,
+        hashes=[
+
+        ]
+    )
\ No newline at end of file
@@ -16,8 +16,6 @@ router = APIRouter()
 from locales.locale import Loc
 from helpers.owoify import handle_uwu
 
-import aiohttp
-
 def process_comment(comment: Comment, is_mod: Optional[bool], localization, uwu_level, comment_delete_action: ServerForm) -> ServerItemCommunityComment:
     return ServerItemCommunityComment(
         name=str(comment.id),
@@ -46,16 +44,9 @@ async def main(request: Request, item_name: str):
     uwu_level = request.state.uwu
     auth = request.headers.get("Sonolus-Session")
     
-    headers = {request.app.auth_header: request.app.auth}
-    if auth:
-        headers["authorization"] = auth
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.get(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/comment/",
-            params={"page": page},
-        ) as req:
-            response = CommentList.model_validate_json(await req.json())
+    response: CommentList = await request.app.backend.comments(
+        item_name.removeprefix("UnCh-"), auth=auth, page=page
+    )
 
     page_count = response.pageCount
     if page > page_count or page < 0:
@@ -7,13 +7,13 @@ from helpers.models.sonolus.submit import ServerSubmitCommentIDActionRequest
 from helpers.models.sonolus.response import ServerSubmitItemCommunityCommentActionResponse
 from helpers.models.api.comments import DeleteCommentResponse
 from helpers.models.api.notifications import NotificationRequest
+from helpers.backend_client import BackendError
 from urllib.parse import parse_qs
 
 router = APIRouter()
 
 from locales.locale import Loc
 
-import aiohttp
 
 @router.post("/", response_model=ServerSubmitItemCommunityCommentActionResponse)
 async def main(
@@ -27,10 +27,7 @@ async def main(
 
     parsed_data = data.parse()
 
-    headers = {request.app.auth_header: request.app.auth}
-    if auth:
-        headers["authorization"] = auth
-    else:
+    if not auth:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=locale.not_logged_in,
@@ -43,30 +40,24 @@ async def main(
             status_code=status.HTTP_404_NOT_FOUND, detail=locale.not_found
         )
     
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.delete(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/comment/{comment_id}/"
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.unknown_error
-                )
-            del_data = DeleteCommentResponse.model_validate_json(await req.json())
-            if del_data.mod and not del_data.owner:
-                async with cs.post(
-                    request.app.api_config["url"]
-                    + f"/api/accounts/notifications/",
-                    json=NotificationRequest(
-                        user_id=del_data.commenter,
-                        title="Comment Deleted",
-                        content=f"#COMMENT_DELETED\n{data['content']}"
-                    ).model_dump(),
-                ) as req:
-                    if req.status != 200:
-                        raise HTTPException(
-                            status_code=req.status, detail=locale.not_mod
-                        )
+    try:
+        del_data: DeleteCommentResponse = await request.app.backend.delete_comment(
+            item_name.removeprefix("UnCh-"), comment_id, auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.unknown_error)
+    if del_data.mod and not del_data.owner:
+        try:
+            await request.app.backend.send_notification(
+                NotificationRequest(
+                    user_id=del_data.commenter,
+                    title="Comment Deleted",
+                    content=f"#COMMENT_DELETED\n{del_data.content}"
+                ),
+                auth,
+            )
+        except BackendError as e:
+            raise HTTPException(status_code=e.status, detail=locale.not_mod)
 
     return ServerSubmitItemCommunityCommentActionResponse(
         key="",
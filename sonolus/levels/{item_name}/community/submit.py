@@ -4,15 +4,13 @@ from fastapi import HTTPException, status
 from helpers.sonolus_typings import ItemType
 
 from helpers.models.sonolus.submit import ServerSubmitCommentActionRequest
-from helpers.models.api.comments import CommentRequest
+from helpers.backend_client import BackendError
 from helpers.models.sonolus.response import ServerSubmitItemCommunityCommentActionResponse
 
 router = APIRouter()
 
 from locales.locale import Locale
 
-import aiohttp
-
 
 @router.post("/", response_model=ServerSubmitItemCommunityCommentActionResponse)
 async def main(
@@ -28,10 +26,7 @@ async def main(
 
     parsed_data = data.parse()
 
-    headers = {request.app.auth_header: request.app.auth}
-    if auth:
-        headers["authorization"] = auth
-    else:
+    if not auth:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=locale.not_logged_in,
@@ -43,16 +38,12 @@ async def main(
             status_code=status.HTTP_404_NOT_FOUND, detail=locale.not_found
         )
     
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.post(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/comment/",
-            json=CommentRequest(content=parsed_data.content).model_dump(),
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.unknown_error
-                )
+    try:
+        await request.app.backend.post_comment(
+            item_name.removeprefix("UnCh-"), parsed_data.content, auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.unknown_error)
 
     return ServerSubmitItemCommunityCommentActionResponse(
         key="",
@@ -7,14 +7,13 @@ from helpers.models.api.levels import GetChartResponse
 from helpers.models.sonolus.item import LevelItem
 from helpers.data_helpers import create_server_form, ServerFormOptionsFactory
 from helpers.api_helpers import api_level_to_level
+from helpers.backend_client import BackendError
 
 router = APIRouter()
 
 from locales.locale import Loc
 from helpers.owoify import handle_item_uwu
 
-import aiohttp
-
 
 @router.get("/", response_model=ServerItemDetails)
 async def main(request: Request, item_name: str):
@@ -24,21 +23,13 @@ async def main(request: Request, item_name: str):
     item_data: LevelItem = None
     auth = request.headers.get("Sonolus-Session")
     actions = []
-    
-    headers = {request.app.auth_header: request.app.auth}
-    if auth:
-        headers["authorization"] = auth
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.get(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/"
-        ) as req:
-            data = await req.json()
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=response["detail"]
-                )
-            response = GetChartResponse.model_validate_json(await req.json())
+
+    try:
+        response: GetChartResponse = await request.app.backend.get_chart(
+            item_name.removeprefix("UnCh-"), auth=auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
 
     asset_base_url = response.asset_base_url.removesuffix("/")
     liked = response.data.liked
@@ -92,7 +83,7 @@ async def main(request: Request, item_name: str):
                 "icon": "unlock", # XXX maybe "hide" would be better
             },
         }
-        current = response["data"]["status"]
+        current = response.data.status
         visibility_values = []
         for s, meta in VISIBILITIES.items():
             visibility_values.append({"name": s, "title": meta["title"]})
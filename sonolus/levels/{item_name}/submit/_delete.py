@@ -1,34 +1,29 @@
 from helpers.models.sonolus.response import ServerSubmitItemActionResponse
 from helpers.models.api.notifications import NotificationRequest
 from helpers.models.api.levels import DeleteChartResponse
+from helpers.backend_client import BackendError
 from fastapi import HTTPException
 from locales.locale import Loc
-import aiohttp
 
-async def delete(headers: dict, request, item_name: str, locale: Loc) -> ServerSubmitItemActionResponse:
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.delete(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/delete/"
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.not_admin_or_owner
-                )
-            data = DeleteChartResponse.model_validate(await req.json())
-        if data.admin and not data.owner:
-            async with cs.post(
-                request.app.api_config["url"] + f"/api/accounts/notifications/",
-                json=NotificationRequest(
+async def delete(auth: str, request, item_name: str, locale: Loc) -> ServerSubmitItemActionResponse:
+    try:
+        data: DeleteChartResponse = await request.app.backend.delete_chart(
+            item_name.removeprefix("UnCh-"), auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.not_admin_or_owner)
+    if data.admin and not data.owner:
+        try:
+            await request.app.backend.send_notification(
+                NotificationRequest(
                     user_id=data.author,
                     title="Chart Deleted",
                     content=f"#CHART_DELETED\n{data.title}",
-                ).model_dump(),
-            ) as req:
-                if req.status != 200:
-                    raise HTTPException(
-                        status_code=req.status, detail=locale.not_mod
-                    )
+                ),
+                auth,
+            )
+        except BackendError as e:
+            raise HTTPException(status_code=e.status, detail=locale.not_mod)
                 
     return ServerSubmitItemActionResponse(
         key="",
@@ -2,19 +2,13 @@ from helpers.models.sonolus.response import ServerSubmitItemActionResponse
 from fastapi import HTTPException
 from typing import Literal
 from locales.locale import Loc
-import aiohttp
+from helpers.backend_client import BackendError
 
-async def like(headers: dict, request, item_name: str, type: Literal["like", "unlike"], locale: Loc) -> ServerSubmitItemActionResponse: # TODO some typing for app and request
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.post(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/like/",
-            json={"type": type},
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.unknown_error
-                )
+async def like(auth: str, request, item_name: str, type: Literal["like", "unlike"], locale: Loc) -> ServerSubmitItemActionResponse: # TODO some typing for app and request
+    try:
+        await request.app.backend.like_chart(item_name.removeprefix("UnCh-"), type, auth)
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.unknown_error)
             
     return ServerSubmitItemActionResponse(
         key="",
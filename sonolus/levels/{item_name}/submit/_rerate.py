@@ -1,7 +1,7 @@
 from helpers.models.sonolus.response import ServerSubmitItemActionResponse
 from fastapi import HTTPException, status
 from locales.locale import Loc
-import aiohttp
+from helpers.backend_client import BackendError
 import decimal
 
 def is_valid_constant(c: str):
@@ -20,29 +20,25 @@ def is_valid_constant(c: str):
     except (decimal.InvalidOperation, ValueError):
         return False
 
-async def rerate(headers: dict, request, item_name, constant: str, locale: Loc) -> ServerSubmitItemActionResponse:
+async def rerate(auth: str, request, item_name, constant: str, locale: Loc) -> ServerSubmitItemActionResponse:
     if not is_valid_constant(constant):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=locale.invalid_constant,
         )
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.patch(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/constant_rate/",
-            json={
-                "constant": float(
-                    decimal.Decimal(constant).quantize(
-                        decimal.Decimal("0.0001"),
-                        rounding=decimal.ROUND_HALF_UP,
-                    )
-                )
-            },
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.not_mod_or_owner
+    try:
+        await request.app.backend.rerate_chart(
+            item_name.removeprefix("UnCh-"),
+            float(
+                decimal.Decimal(constant).quantize(
+                    decimal.Decimal("0.0001"),
+                    rounding=decimal.ROUND_HALF_UP,
                 )
+            ),
+            auth,
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.not_mod_or_owner)
             
     return ServerSubmitItemActionResponse(
         key="",
@@ -1,20 +1,16 @@
 from helpers.models.sonolus.response import ServerSubmitItemActionResponse
 from fastapi import HTTPException
 from locales.locale import Loc
+from helpers.backend_client import BackendError
 from typing import Literal
-import aiohttp
 
-async def staff_pick(headers: dict, request, item_name: str, type: Literal["staff_pick_add", "staff_pick_delete"], locale: Loc) -> ServerSubmitItemActionResponse:
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.patch(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/stpick/",
-            json={"value": True if type == "staff_pick_add" else False},
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.not_mod
-                )
+async def staff_pick(auth: str, request, item_name: str, type: Literal["staff_pick_add", "staff_pick_delete"], locale: Loc) -> ServerSubmitItemActionResponse:
+    try:
+        await request.app.backend.set_staff_pick(
+            item_name.removeprefix("UnCh-"), type == "staff_pick_add", auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.not_mod)
             
     return ServerSubmitItemActionResponse(
         key="",
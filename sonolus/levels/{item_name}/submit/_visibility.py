@@ -3,38 +3,32 @@ from helpers.models.api.notifications import NotificationRequest
 from helpers.models.api.levels import VisibilityChangeResponse
 from helpers.models.sonolus.response import ServerSubmitItemActionResponse
 from locales.locale import Loc
+from helpers.backend_client import BackendError
 from typing import Literal
-import aiohttp
 
-async def visibility(headers: dict, request, item_name: str, visibility: Literal["UNLISTED", "PRIVATE", "PUBLIC"], locale: Loc) -> ServerSubmitItemActionResponse:
-    async with aiohttp.ClientSession(headers=headers) as cs:
-        async with cs.patch(
-            request.app.api_config["url"]
-            + f"/api/charts/{item_name.removeprefix('UnCh-')}/visibility/",
-            json={"status": visibility},
-        ) as req:
-            if req.status != 200:
-                raise HTTPException(
-                    status_code=req.status, detail=locale.not_mod_or_owner
-                )
-            data = VisibilityChangeResponse.model_validate(await req.json())
-        if (
-            visibility != "PUBLIC"
-            and data.mod
-            and not data.owner
-        ):
-            async with cs.post(
-                request.app.api_config["url"] + f"/api/accounts/notifications/",
-                json=NotificationRequest(
+async def visibility(auth: str, request, item_name: str, visibility: Literal["UNLISTED", "PRIVATE", "PUBLIC"], locale: Loc) -> ServerSubmitItemActionResponse:
+    try:
+        data: VisibilityChangeResponse = await request.app.backend.set_chart_visibility(
+            item_name.removeprefix("UnCh-"), visibility, auth
+        )
+    except BackendError as e:
+        raise HTTPException(status_code=e.status, detail=locale.not_mod_or_owner)
+    if (
+        visibility != "PUBLIC"
+        and data.mod
+        and not data.owner
+    ):
+        try:
+            await request.app.backend.send_notification(
+                NotificationRequest(
                     user_id=data.author,
                     title="Chart Visibility Update",
                     content=f"#CHART_VISIBILITY_CHANGED\n{visibility}\n{data.title}"
-                )
-            ) as req:
-                if req.status != 200:
-                    raise HTTPException(
-                        status_code=req.status, detail=locale.not_mod
-                    )
+                ),
+                auth,
+            )
+        except BackendError as e:
+            raise HTTPException(status_code=e.status, detail=locale.not_mod)
                 
     return ServerSubmitItemActionResponse(
         key="",
@@ -25,26 +25,24 @@ async def main(
 
     flattened_data = data.parse()
 
-    headers = {request.app.auth_header: request.app.auth}
-    if auth:
-        headers["authorization"] = auth
-    else:
+    if not auth:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=locale.not_logged_in,
         )
     
+    type = flattened_data.type
     match type:
         case "like" | "unlike":
-            return await _like.like(headers, request, item_name, type, locale)
+            return await _like.like(auth, request, item_name, type, locale)
         case "delete":
-            return await _delete.delete(headers, request, item_name, locale)
+            return await _delete.delete(auth, request, item_name, locale)
         case "visibility":
-            return await _visibility.visibility(headers, request, item_name, flattened_data.visibility, locale)
+            return await _visibility.visibility(auth, request, item_name, flattened_data.visibility, locale)
         case "rerate":
-            return await _rerate.rerate(headers, request, item_name, flattened_data.constant, locale)
+            return await _rerate.rerate(auth, request, item_name, flattened_data.constant, locale)
         case "staff_pick_add" | "staff_pick_delete":
-            return await _staff_pick.staff_pick(headers, request, item_name, type, locale)
+            return await _staff_pick.staff_pick(auth, request, item_name, type, locale)
         case _:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=locale.not_found
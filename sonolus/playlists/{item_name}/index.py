@@ -1,4 +1,4 @@
-import base64, asyncio
+import base64
 
 from urllib.parse import parse_qs
 from fastapi import APIRouter, Request
@@ -7,15 +7,13 @@ from fastapi import HTTPException, status
 from helpers.data_compilers import compile_playlists_list
 from helpers.sonolus_typings import ItemType
 from helpers.models.sonolus.response import ServerItemDetails
-from helpers.data_helpers import create_server_form, ServerFormOptionsFactory
-from helpers.api_helpers import api_level_to_level
+from helpers.search_forms import uploaded_filter_form, json_response
+from helpers.api_helpers import api_levels_to_levels
 
 router = APIRouter()
 
 from locales.locale import Loc
-from helpers.owoify import handle_item_uwu, handle_uwu
-
-import aiohttp
+from helpers.owoify import handle_item_uwu
 
 @router.get("/")
 async def main(request: Request, item_type: ItemType, item_name: str):
@@ -40,8 +38,6 @@ async def main(request: Request, item_type: ItemType, item_name: str):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="huh")
         parsed = parse_qs(base64.b64decode(parts[1].encode()).decode())
         flattened_data = {k: v[0] for k, v in parsed.items()}
-        headers = {request.app.auth_header: request.app.auth}
-        headers["authorization"] = auth
         params = {
             "type": "advanced",
         }
@@ -234,31 +230,17 @@ async def main(request: Request, item_type: ItemType, item_name: str):
             params["meta_includes"] = keywords
         params = {k: v for k, v in params.items() if v is not None}
 
-        async with aiohttp.ClientSession(headers=headers) as cs:
-            async with cs.get(
-                request.app.api_config["url"] + f"/api/charts/",
-                params={
-                    k: (int(v) if isinstance(v, bool) else v)
-                    for k, v in params.items()
-                    if v is not None
-                },
-            ) as req:
-                response = await req.json()
-        asset_base_url = response["asset_base_url"].removesuffix("/")
-        levels = await asyncio.gather(
-            *[
-                request.app.run_blocking(
-                    api_level_to_level,
-                    request,
-                    asset_base_url,
-                    level,
-                    request.state.levelbg,
-                )
-                for level in response["data"]
-            ]
+        response = await request.app.backend.list_charts(params, auth=auth)
+        asset_base_url = response.asset_base_url.removesuffix("/")
+        levels = await request.app.run_blocking(
+            api_levels_to_levels,
+            request,
+            asset_base_url,
+            response.data,
+            request.state.levelbg,
         )
-        pageCount = response["pageCount"]
-        if sort_by == "random" and pageCount != 0 and len(response["data"]) == 10:
+        pageCount = response.pageCount
+        if sort_by == "random" and pageCount != 0 and len(response.data) == 10:
             pageCount = (
                 page + 2
             )  # always have one extra page, random will not run out and there may be duplicates
@@ -287,247 +269,34 @@ async def main(request: Request, item_type: ItemType, item_name: str):
             f"uploaded_{base64.urlsafe_b64encode(parts[1].encode()).decode()}"
         )
         item_data["levels"] = levels
-        options = []
-        options.append(
-            ServerFormOptionsFactory.server_select_option(
-                query="status",
-                name=locale.search.VISIBILITY,
-                required=False,
-                default=level_status or "ALL",
-                values=[
-                    {"name": "ALL", "title": locale.search.VISIBILITY_ALL},
-                    {
-                        "name": "PUBLIC_MINE",
-                        "title": locale.search.VISIBILITY_PUBLIC,
-                    },
-                    {
-                        "name": "UNLISTED",
-                        "title": locale.search.VISIBILITY_UNLISTED,
-                    },
-                    {"name": "PRIVATE", "title": locale.search.VISIBILITY_PRIVATE},
-                ],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_select_option(
-                query="staff_pick",
-                name=locale.staff_pick,
-                required=False,
-                default=staff_pick,
-                description=handle_uwu(
-                    locale.search.STAFF_PICK_DESC, request.state.localization, uwu_level
-                ),
-                values=[
-                    {"name": "default", "title": "#DEFAULT"},
-                    {"name": "off", "title": locale.search.STAFF_PICK_OFF},
-                    {"name": "true", "title": locale.search.STAFF_PICK_TRUE},
-                    {"name": "false", "title": locale.search.STAFF_PICK_FALSE},
-                ],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="keywords",
-                name="#KEYWORDS",
-                required=False,
-                default=keywords or "",
-                placeholder=locale.search.ENTER_TEXT,
-                limit=100,
-                shortcuts=[],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="min_rating",
-                name=locale.search.MIN_RATING,
-                required=False,
-                default=min_rating or -999,
-                min_value=-999,
-                max_value=999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="max_rating",
-                name=locale.search.MAX_RATING,
-                required=False,
-                default=max_rating or 999,
-                min_value=-999,
-                max_value=999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="title_includes",
-                name=locale.search.TITLE_CONTAINS,
-                required=False,
-                default=title_includes or "",
-                placeholder=locale.search.ENTER_TEXT,
-                limit=100,
-                shortcuts=[],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="author_includes",
-                name=locale.search.AUTHOR_CONTAINS,
-                required=False,
-                default=author_includes or "",
-                placeholder=locale.search.ENTER_TEXT,
-                limit=60,
-                shortcuts=[],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="description_includes",
-                name=locale.search.DESCRIPTION_CONTAINS,
-                required=False,
-                default=description_includes or "",
-                placeholder=locale.search.ENTER_TEXT,
-                limit=200,
-                shortcuts=[],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="artists_includes",
-                name=locale.search.ARTISTS_CONTAINS,
-                required=False,
-                default=artists_includes or "",
-                placeholder=locale.search.ENTER_TEXT,
-                limit=100,
-                shortcuts=[],
-            )
-        )
-        if auth:
-            options.append(
-                ServerFormOptionsFactory.server_toggle_option(
-                    query="liked_by",
-                    name=locale.search.ONLY_LEVELS_I_LIKED,
-                    required=False,
-                    default=liked_by,
-                )
-            )
-            options.append(
-                ServerFormOptionsFactory.server_toggle_option(
-                    query="commented_on",
-                    name=locale.search.ONLY_LEVELS_I_COMMENTED_ON,
-                    required=False,
-                    default=commented_on,
-                )
-            )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="min_likes",
-                name=locale.search.MIN_LIKES,
-                required=False,
-                default=min_likes or 0,
-                min_value=0,
-                max_value=9999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="max_likes",
-                name=locale.search.MAX_LIKES,
-                required=False,
-                default=max_likes or 9999,
-                min_value=0,
-                max_value=9999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="min_comments",
-                name=locale.search.MIN_COMMENTS,
-                required=False,
-                default=min_comments or 0,
-                min_value=0,
-                max_value=9999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_slider_option(
-                query="max_comments",
-                name=locale.search.MAX_COMMENTS,
-                required=False,
-                default=max_comments or 9999,
-                min_value=0,
-                max_value=9999,
-                step=1,
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_text_option(
-                query="tags",
-                name=locale.search.TAGS_COMMA_SEPARATED,
-                required=False,
-                default=tags or "",
-                placeholder=locale.search.ENTER_TAGS,
-                limit=200,
-                shortcuts=[],
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_select_option(
-                query="sort_by",
-                name=locale.search.SORT_BY,
-                required=False,
-                default=sort_by or "created_at",
-                values=[
-                    {"name": "created_at", "title": locale.search.DATE_CREATED},
-                    {"name": "random", "title": "#RANDOM"},
-                    {"name": "rating", "title": locale.search.RATING},
-                    {"name": "likes", "title": locale.search.LIKES},
-                    {"name": "comments", "title": locale.search.COMMENTS},
-                    {
-                        "name": "decaying_likes",
-                        "title": locale.search.DECAYING_LIKES,
-                    },
-                    {"name": "abc", "title": locale.search.TITLE_A_Z},
-                ],
-                description=handle_uwu(
-                    locale.search.SORT_BY_DESCRIPTION,
-                    request.state.localization,
-                    uwu_level,
-                ),
-            )
-        )
-        options.append(
-            ServerFormOptionsFactory.server_select_option(
-                query="sort_order",
-                name=locale.search.SORT_ORDER,
-                required=False,
-                default=sort_order or "desc",
-                values=[
-                    {"name": "desc", "title": locale.search.DESCENDING},
-                    {"name": "asc", "title": locale.search.ASCENDING},
-                ],
-            )
+        # the form is serialized once per (locale, uwu, logged in),
+        # only the current filter values are filled in here
+        filter_form = uploaded_filter_form(
+            request.state.localization, uwu_level, bool(auth)
         )
         actions.append(
-            create_server_form(
-                type="filter",
+            filter_form.render(
                 title=locale.search.FILTERS(page, pageCount),
-                require_confirmation=False,
-                options=[
-                    ServerFormOptionsFactory.server_slider_option(
-                        query="page",
-                        name="Page",
-                        default=page,
-                        min_value=1,
-                        max_value=pageCount,
-                        step=1,
-                        required=False,
-                    )
-                ]
-                + options,
+                page=page,
+                pageCount=pageCount,
+                status=level_status or "ALL",
+                staff_pick=staff_pick,
+                keywords=keywords or "",
+                min_rating=min_rating or -999,
+                max_rating=max_rating or 999,
+                title_includes=title_includes or "",
+                author_includes=author_includes or "",
+                description_includes=description_includes or "",
+                artists_includes=artists_includes or "",
+                liked_by=liked_by,
+                commented_on=commented_on,
+                min_likes=min_likes or 0,
+                max_likes=max_likes or 9999,
+                min_comments=min_comments or 0,
+                max_comments=max_comments or 9999,
+                tags=tags or "",
+                sort_by=sort_by or "created_at",
+                sort_order=sort_order or "desc",
             )
         )
    
@@ -554,4 +323,4 @@ async def main(request: Request, item_type: ItemType, item_name: str):
     }
     if data.get("description"):
         detail["description"] = data["description"]
-    return detail
+    return json_response(detail)
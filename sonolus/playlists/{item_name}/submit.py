@@ -12,8 +12,6 @@ router = APIRouter()
 
 from locales.locale import Loc
 
-import aiohttp
-
 
 class ServerSubmitItemActionRequest(BaseModel):
     values: str
@@ -20,8 +20,6 @@ router = APIRouter()
 from locales.locale import Loc
 from helpers.owoify import handle_item_uwu
 
-import aiohttp
-
 
 @router.get("/")
 async def main(request: Request, item_type: ItemType):
@@ -45,15 +43,9 @@ async def main(request: Request, item_type: ItemType):
             ),
         ]
         if auth:
-            headers = {request.app.auth_header: request.app.auth}
-            headers["authorization"] = auth
-            async with aiohttp.ClientSession(headers=headers) as cs:
-                async with cs.get(
-                    request.app.api_config["url"] + f"/api/accounts/notifications/",
-                    params={"only_unread": 1},
-                ) as req:
-                    response = await req.json()
-                    response = NotificationList.model_validate(await req.json())
+            response: NotificationList = await request.app.backend.notifications(
+                auth, only_unread=True
+            )
             notifs = response.to_posts(request)
             if notifs:
                 sections.insert(
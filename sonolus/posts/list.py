@@ -3,9 +3,6 @@ import asyncio
 from fastapi import APIRouter, Request, Query
 from fastapi import HTTPException, status
 
-
-import aiohttp
-
 from helpers.paginate import list_to_pages
 from helpers.models.api.notifications import NotificationList
 
@@ -27,15 +24,10 @@ async def main(
     auth = request.headers.get("Sonolus-Session")
 
     if auth:
-        headers = {request.app.auth_header: request.app.auth}
-        headers["authorization"] = auth
-        async with aiohttp.ClientSession(headers=headers) as cs:
-            async with cs.get(
-                request.app.api_config["url"] + f"/api/accounts/notifications/",
-                params={"only_unread": 0},
-            ) as req:
-                response = NotificationList.model_validate(await req.json())
-        notifs = response.to_posts()
+        response: NotificationList = await request.app.backend.notifications(
+            auth, only_unread=False
+        )
+        notifs = response.to_posts(request)
     if not (auth and notifs):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -8,14 +8,13 @@ from helpers.data_compilers import compile_static_posts_list
 from helpers.sonolus_typings import ItemType
 from helpers.models.sonolus.response import ServerItemDetails
 from helpers.models.api.notifications import Notification
+from helpers.backend_client import BackendError
 
 router = APIRouter()
 
 from locales.locale import Loc
 from helpers.owoify import handle_item_uwu, handle_uwu
 
-import aiohttp
-
 
 @router.get("/")
 async def main(request: Request, item_type: ItemType, item_name: str):
@@ -29,17 +28,12 @@ async def main(request: Request, item_type: ItemType, item_name: str):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=locale.not_logged_in,
             )
-        headers = {"authorization": auth}
-        async with aiohttp.ClientSession(headers=headers) as cs:
-            async with cs.get(
-                request.app.api_config["url"]
-                + f"/api/accounts/notifications/{item_name.removeprefix('notification-')}/"
-            ) as req:
-                if req.status != 200:
-                    raise HTTPException(
-                        status_code=req.status, detail=locale.not_found
-                    )
-                data = Notification.model_validate(await req.json())
+        try:
+            data: Notification = await request.app.backend.get_notification(
+                item_name.removeprefix("notification-"), auth
+            )
+        except BackendError as e:
+            raise HTTPException(status_code=e.status, detail=locale.not_found)
         item_data, desc = data.to_post(request)
     else:
         item_data = await request.app.run_blocking(
@@ -1,15 +1,128 @@
+from typing import Iterator
+
 from fastapi import APIRouter, Request, status, Response
 from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-from helpers.repository_map import repo
+from helpers.repository_map import repo, ZipChainFile
 
 router = APIRouter()
 
+# files are addressed by their sha1, so a URL's content never changes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single "bytes=start-end" range into inclusive offsets.
+    Returns None for anything else (multiple ranges, other units), which is
+    served as the full file. Raises ValueError if the range is unsatisfiable,
+    which every range of an empty file is.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    start, sep, end = ranges.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        first = int(start) if start else None
+        last = int(end) if end else None
+    except ValueError:
+        return None
+    if first is None:  # suffix range, the last `last` bytes
+        if last is None:
+            return None
+        if last <= 0 or size == 0:
+            raise ValueError("unsatisfiable suffix range")
+        return max(size - last, 0), size - 1
+    if last is None:
+        last = size - 1
+    if first >= size or last < first:
+        raise ValueError("unsatisfiable range")
+    return first, min(last, size - 1)
+
+
+def iter_file(f: ZipChainFile, start: int, length: int) -> Iterator[bytes]:
+    # closing twice is fine, see the BackgroundTask in main()
+    try:
+        if start:
+            f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
 
 @router.get("/{hash}/")
 async def main(request: Request, hash: str):
     # This only handles static!
+    if not repo.has_hash(hash):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    headers = {"ETag": f'"{hash}"', "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    media_type = repo.get_content_type(hash)
+
+    file_path = repo.get_file_path(hash)
+    if file_path:
+        # streamed in chunks (or sendfile), handles Range and If-Range itself
+        return FileResponse(file_path, media_type=media_type, headers=headers)
+
+    if repo.get_zip_chain(hash):
+        try:
+            f = await request.app.run_blocking(repo.open_zip_chain, hash)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        headers["Accept-Ranges"] = "bytes"
+        start, end = 0, f.size - 1
+        status_code = status.HTTP_200_OK
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        # If-Range with anything but our (strong) ETag means "send it all"
+        if range_header and (not if_range or if_range.strip() == headers["ETag"]):
+            try:
+                byte_range = parse_range(range_header, f.size)
+            except ValueError:
+                f.close()
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={**headers, "Content-Range": f"bytes */{f.size}"},
+                )
+            if byte_range:
+                start, end = byte_range
+                status_code = status.HTTP_206_PARTIAL_CONTENT
+                headers["Content-Range"] = f"bytes {start}-{end}/{f.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            iter_file(f, start, end - start + 1),
+            status_code=status_code,
+            media_type=media_type,
+            headers=headers,
+            # the generator's finally never runs if the client disconnects
+            # before the first chunk
+            background=BackgroundTask(f.close),
+        )
+
+    # in-memory data (add_bytes)
     file_data = await request.app.run_blocking(repo.get_file, hash)
-    if file_data:
-        return Response(content=file_data)
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if file_data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return Response(content=file_data, media_type=media_type, headers=headers)
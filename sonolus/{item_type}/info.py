@@ -22,8 +22,6 @@ router = APIRouter()
 from locales.locale import Loc
 from helpers.owoify import handle_uwu, handle_item_uwu
 
-import aiohttp
-
 @router.get("/")
 async def main(request: Request, item_type: ItemType):
     locale: Loc = request.state.loc
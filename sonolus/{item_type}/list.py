@@ -1,16 +1,17 @@
-from fastapi import APIRouter, Request, Query
+from fastapi import APIRouter, Request, Query, Response
 from fastapi import HTTPException, status
 
 from helpers.data_compilers import (
-    compile_engines_list,
+    engines_catalog,
     compile_backgrounds_list,
     compile_effects_list,
     compile_particles_list,
-    compile_skins_list,
+    skins_catalog,
     # compile_replays_list,
     # compile_rooms_list
 )
 from helpers.paginate import list_to_pages
+from helpers.response_cache import response_cache
 from helpers.sonolus_typings import ItemType
 from helpers.models.sonolus.response import ServerItemList
 
@@ -19,8 +20,6 @@ router = APIRouter()
 from locales.locale import Loc
 from helpers.owoify import handle_item_uwu
 
-type_func = type
-
 
 @router.get("/", response_model=ServerItemList)
 async def main(
@@ -32,22 +31,24 @@ async def main(
     uwu_level = request.state.uwu
     searching = False
 
+    # only the skins list depends on the default engine
+    engine = request.state.engine if item_type == "skins" else None
+    cache_key = ("list", item_type, request.state.localization, uwu_level, engine, page)
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    generation = response_cache.generation
+
     match item_type:
         case "engines":
-            data = await request.app.run_blocking(
-                compile_engines_list, request.app.base_url, request.state.localization
+            data = list(
+                await request.app.run_blocking(
+                    engines_catalog, request.app.base_url, request.state.localization
+                )
             )
         case "skins":
-            data = await request.app.run_blocking(compile_skins_list, request.app.base_url)
-            data = [
-                item
-                for item in data
-                if (item.get("engines") == None)
-                or (
-                    (type_func(item.get("engines")) in [list, tuple])
-                    and (request.state.engine in item.get("engines"))
-                )
-            ]
+            skins = await request.app.run_blocking(skins_catalog, request.app.base_url)
+            data = skins.for_engine(request.state.engine)
 
         case "backgrounds":
             data = await request.app.run_blocking(
@@ -60,9 +61,12 @@ async def main(
                 compile_effects_list, request.app.base_url
             )
         case "particles":
-            data = await request.app.run_blocking(
-                compile_particles_list, request.app.base_url
-            )
+            data = [
+                particle
+                for particle, _ in await request.app.run_blocking(
+                    compile_particles_list, request.app.base_url
+                )
+            ]
         case _:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -82,14 +86,13 @@ async def main(
     
     try:
         page_data = pages[page]
-    except KeyError:
+    except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="hi stop hitting our api thanks",
         )
     
     page_data = handle_item_uwu(page_data, request.state.localization, uwu_level)
-    return ServerItemList(
-        pageCount=len(pages),
-        items=page_data
-    )
+    body = ServerItemList(pageCount=len(pages), items=page_data).model_dump_json().encode()
+    response_cache.put(cache_key, body, generation)
+    return Response(content=body, media_type="application/json")
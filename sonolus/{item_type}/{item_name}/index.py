@@ -1,21 +1,10 @@
-import base64, asyncio
-
-from urllib.parse import parse_qs
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
 from fastapi import HTTPException, status
 
-from helpers.data_compilers import (
-    compile_engines_list,
-    compile_backgrounds_list,
-    compile_effects_list,
-    compile_particles_list,
-    compile_skins_list,
-    # compile_replays_list,
-    # compile_rooms_list
-)
+from helpers.data_compilers import get_catalog
+from helpers.response_cache import response_cache
 from helpers.sonolus_typings import ItemType
 from helpers.models.sonolus.response import ServerItemDetails
-from helpers.models.sonolus.item import ServerItem
 
 router = APIRouter()
 
@@ -25,56 +14,50 @@ from locales.locale import Loc
 @router.get("/")
 async def main(request: Request, item_type: ItemType, item_name: str):
     locale: Loc = request.state.loc
-    item_data: ServerItem = None
 
-    match item_type:
-        case "engines":
-            data = await request.app.run_blocking(
-                compile_engines_list, request.app.base_url, request.state.localization
-            )
-        case "skins":
-            data = await request.app.run_blocking(compile_skins_list, request.app.base_url)
-        case "backgrounds":
-            item_data = (
-                await request.app.run_blocking(
-                    compile_backgrounds_list,
-                    request.app.base_url,
-                    request.state.localization,
-                )
-            )[0]
-        case "effects":
-            data = await request.app.run_blocking(
-                compile_effects_list, request.app.base_url
-            )     
-        case "particles":
-            data = await request.app.run_blocking(
-                compile_particles_list, request.app.base_url
-            )
-        # case "replays":
-        #     data = await request.app.run_blocking(compile_replays_list, request.app.base_url)
-        # case "rooms":
-        #     data = await request.app.run_blocking(compile_rooms_list, request.app.base_url)
-        case _:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=locale.item_not_found(item_type, item_name),
-            )
-        
-    if not item_data:
-        item_data = next((i for i in data if i.name == item_name), None)
-        if not item_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=locale.item_not_found(
-                    item_type.capitalize().removesuffix("s"), item_name
-                ),
-            )
+    # keyed by the resolved item's name (see below), so real names hit here
+    # and junk background names don't each get an entry
+    cache_key = ("details", item_type, request.state.localization, item_name)
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    generation = response_cache.generation
 
-    return ServerItemDetails(
+    catalog = await request.app.run_blocking(
+        get_catalog, item_type, request.app.base_url, request.state.localization
+    )
+    # case "replays", case "rooms": not implemented yet
+    if catalog is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=locale.item_not_found(item_type, item_name),
+        )
+
+    # a known background name gets that background (this used to always be
+    # the first one); any other name still gets the first, the default one
+    item_data = catalog.get(item_name)
+    if not item_data and item_type == "backgrounds" and len(catalog):
+        item_data = catalog[0]
+    if not item_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=locale.item_not_found(
+                item_type.capitalize().removesuffix("s"), item_name
+            ),
+        )
+    if item_data.name != item_name:
+        cache_key = ("details", item_type, request.state.localization, item_data.name)
+        body = response_cache.get(cache_key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+
+    body = ServerItemDetails(
         item=item_data,
         description=item_data.description if hasattr(item_data, "description") and item_data.description else None,
         actions=[],
         hasCommunity=False,
         leaderboards=[],
         sections=[]
-    )
+    ).model_dump_json().encode()
+    response_cache.put(cache_key, body, generation)
+    return Response(content=body, media_type="application/json")